@@ -3,6 +3,7 @@ SmartCSV – Flask REST API.
 
 Endpoints:
     POST /upload    – Upload CSV, return metadata.
+    POST /upload_raw – Upload CSV as a raw request body, return metadata.
     POST /process   – Run ETL pipeline, return summary.
     GET  /insights  – Return stats, charts, NLG insights.
     GET  /download  – Download processed CSV.
@@ -19,22 +20,71 @@ from flask import (
     request,
     send_file,
 )
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_options_header
 
 import config
-from etl import run_etl
+from etl import run_etl_cached
 from insights import generate_full_insights
-from utils.file_handler import load_csv, save_upload
+from utils.file_handler import load_csv_cached, load_processed, save_upload, save_upload_stream
 from utils.logger import get_logger
-from utils.validators import get_upload_metadata, validate_csv, validate_file_size
+from utils.validators import get_upload_metadata, quality_counts, validate_csv, validate_file_size
+
+try:
+    import orjson
+except ImportError:  # optional – falls back to Flask's stdlib json encoder
+    orjson = None
 
 logger = get_logger(__name__)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Keeps the default provider's sorted keys and ``default`` hook (HTTP
+    dates, dataclasses, ``Decimal``), also accepts numpy arrays and scalars,
+    and writes NaN/Infinity as ``null`` instead of invalid JSON. Without
+    orjson it behaves exactly like :class:`DefaultJSONProvider`.
+    """
+
+    option: int = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    ) if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs) -> str:  # noqa: ANN001, ANN003
+        """Serialise *obj* to a JSON string."""
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def response(self, *args, **kwargs):  # noqa: ANN002, ANN003, ANN201
+        """Build a JSON response from the encoded bytes, skipping str round-trips."""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype,
+        )
+
+
 # ── App factory ─────────────────────────────────────────────────────────
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config["MAX_CONTENT_LENGTH"] = config.MAX_CONTENT_LENGTH
 app.config["SECRET_KEY"] = config.SECRET_KEY
 CORS(app)
+cache = Cache(app, config={
+    "CACHE_TYPE": "FileSystemCache",
+    "CACHE_DIR": str(config.CACHE_FOLDER),
+    "CACHE_DEFAULT_TIMEOUT": config.INSIGHTS_CACHE_TIMEOUT,
+})
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -98,26 +148,74 @@ def upload_file():  # noqa: ANN201
 
     try:
         saved_path = save_upload(file, filename)
-        validate_file_size(saved_path)
-        df = load_csv(saved_path)
-        warnings = validate_csv(df)
-        metadata = get_upload_metadata(df, saved_path)
-        metadata["warnings"] = warnings
-        logger.info("Upload successful: %s", saved_path.name)
-        return jsonify(metadata), 200
+        return jsonify(_describe_upload(saved_path)), 200
+    except ValueError as exc:
+        logger.warning("Upload validation failed: %s", exc)
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:
+        logger.exception("Upload failed")
+        return jsonify({"error": f"Upload failed: {exc}"}), 500
+
+
+@app.route("/upload_raw", methods=["POST"])
+def upload_raw():  # noqa: ANN201
+    """Upload a CSV sent as the raw request body and return metadata.
+
+    The filename is taken from the ``Content-Disposition`` header, e.g.
+    ``attachment; filename="data.csv"``. The body is streamed to disk in
+    1 MB chunks, bypassing multipart form parsing.
+
+    Returns:
+        JSON with file metadata or error message.
+    """
+    _, options = parse_options_header(request.headers.get("Content-Disposition", ""))
+    filename = options.get("filename")
+    if not filename:
+        return jsonify({"error": "Missing filename in Content-Disposition header."}), 400
+
+    stream = request.stream  # raises 413 up front if Content-Length is too large
+    try:
+        saved_path = save_upload_stream(stream, filename)
+        return jsonify(_describe_upload(saved_path)), 200
     except ValueError as exc:
         logger.warning("Upload validation failed: %s", exc)
         return jsonify({"error": str(exc)}), 400
+    except HTTPException:
+        raise  # e.g. 413 from a chunked body that outgrows MAX_CONTENT_LENGTH
     except Exception as exc:
         logger.exception("Upload failed")
         return jsonify({"error": f"Upload failed: {exc}"}), 500
 
 
+def _describe_upload(saved_path: Path) -> dict:
+    """Validate a saved upload and build its metadata response.
+
+    Args:
+        saved_path: Path of the file in the uploads folder.
+
+    Returns:
+        Metadata dictionary including validation warnings.
+
+    Raises:
+        ValueError: If the file is too large or fails CSV validation.
+    """
+    size = saved_path.stat().st_size
+    validate_file_size(saved_path, size)
+    df = load_csv_cached(saved_path)
+    na_counts, dup_count = quality_counts(df)
+    warnings = validate_csv(df, na_counts, dup_count)
+    metadata = get_upload_metadata(df, saved_path, na_counts, dup_count, size=size)
+    metadata["warnings"] = warnings
+    logger.info("Upload successful: %s", saved_path.name)
+    return metadata
+
+
 @app.route("/process", methods=["POST"])
 def process_file():  # noqa: ANN201
     """Run ETL pipeline on an uploaded file.
 
-    Expects JSON body: ``{"filename": "..."}``
+    Expects JSON body: ``{"filename": "..."}``. Pass ``?deep=1`` to report
+    deep (per-string) memory usage in ``memory_reduction_mb``.
 
     Returns:
         JSON with ETL summary or error message.
@@ -132,7 +230,8 @@ def process_file():  # noqa: ANN201
         return jsonify({"error": f"File '{filename}' not found."}), 404
 
     try:
-        _, summary, output_path = run_etl(file_path)
+        deep = request.args.get("deep") == "1"
+        summary, output_path = run_etl_cached(file_path, deep_memory=deep)
         logger.info("ETL complete: %s -> %s", filename, output_path.name)
         return jsonify(summary), 200
     except ValueError as exc:
@@ -149,6 +248,9 @@ def get_insights():  # noqa: ANN201
 
     Query param: ``?file=cleaned_...``
 
+    The serialised response is cached, keyed on the file's name, mtime and
+    size, so repeat requests for an unchanged file skip load and compute.
+
     Returns:
         JSON with stats, charts, NLG insights.
     """
@@ -160,11 +262,20 @@ def get_insights():  # noqa: ANN201
     if not file_path.exists():
         return jsonify({"error": f"Processed file '{filename}' not found."}), 404
 
+    stat = file_path.stat()
+    cache_key = f"insights:{filename}:{stat.st_mtime_ns}:{stat.st_size}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.info("Insights cache hit for %s", filename)
+        return app.response_class(cached, mimetype="application/json"), 200
+
     try:
-        df = load_csv(file_path)
+        df = load_processed(file_path)
         result = generate_full_insights(df)
         logger.info("Insights generated for %s", filename)
-        return jsonify(result), 200
+        response = jsonify(result)
+        cache.set(cache_key, response.get_data())
+        return response, 200
     except Exception as exc:
         logger.exception("Insight generation failed")
         return jsonify({"error": f"Insight generation failed: {exc}"}), 500
@@ -192,6 +303,9 @@ def download_file():  # noqa: ANN201
 # ═══════════════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
+    # Development server only – production runs `gunicorn -c gunicorn_conf.py app:app`
+    if not config.FLASK_DEBUG:
+        logger.warning("Using the Flask development server; run gunicorn with gunicorn_conf.py in production.")
     logger.info("Starting SmartCSV on %s:%s", config.FLASK_HOST, config.FLASK_PORT)
     app.run(
         host=config.FLASK_HOST,
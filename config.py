@@ -17,9 +17,12 @@ ROOT_STORAGE = Path("/tmp") if IS_VERCEL else BASE_DIR
 UPLOAD_FOLDER: Path = Path(os.getenv("UPLOAD_FOLDER", str(ROOT_STORAGE / "uploads")))
 PROCESSED_FOLDER: Path = Path(os.getenv("PROCESSED_FOLDER", str(ROOT_STORAGE / "processed")))
 LOG_FOLDER: Path = Path(os.getenv("LOG_FOLDER", str(ROOT_STORAGE / "logs")))
+CACHE_FOLDER: Path = Path(os.getenv("CACHE_FOLDER", str(ROOT_STORAGE / "cache")))
 
 # ── File Upload ─────────────────────────────────────────────────────────
 MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", str(10 * 1024 * 1024)))  # 10 MB
+UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1 MB reads for /upload_raw
+CSV_READ_BLOCK_SIZE: int = 4 * 1024 * 1024  # pyarrow CSV reader block (4 MB)
 ALLOWED_EXTENSIONS: set[str] = {"csv"}
 ALLOWED_MIME_TYPES: set[str] = {
     "text/csv",
@@ -43,12 +46,19 @@ LOG_BACKUP_COUNT: int = 3
 SKEWNESS_THRESHOLD: float = 1.0  # use median if abs(skew) > threshold
 IQR_MULTIPLIER: float = 1.5
 DATETIME_MISSING_DROP_PCT: float = 5.0  # drop datetime rows if missing < 5 %
+# Files above this are cleaned in row chunks. The default sits above
+# MAX_CONTENT_LENGTH, so chunking only applies once uploads are allowed to
+# grow past it (or either limit is lowered).
+ETL_CHUNK_THRESHOLD_BYTES: int = int(os.getenv("ETL_CHUNK_THRESHOLD_BYTES", str(50 * 1024 * 1024)))
+ETL_CHUNK_ROWS: int = int(os.getenv("ETL_CHUNK_ROWS", "100000"))
 TOP_N_CATEGORIES: int = 10
 
 # ── Insight / Chart Settings ───────────────────────────────────────────
 MAX_PIE_CATEGORIES: int = 7
 CORRELATION_SIGNIFICANCE: float = 0.05
+INSIGHTS_CACHE_TIMEOUT: int = int(os.getenv("INSIGHTS_CACHE_TIMEOUT", "3600"))  # seconds
+INSIGHTS_MAX_WORKERS: int = int(os.getenv("INSIGHTS_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))  # threads per request
 
 # ── Ensure directories exist ───────────────────────────────────────────
-for _dir in (UPLOAD_FOLDER, PROCESSED_FOLDER, LOG_FOLDER):
+for _dir in (UPLOAD_FOLDER, PROCESSED_FOLDER, LOG_FOLDER, CACHE_FOLDER):
     _dir.mkdir(parents=True, exist_ok=True)
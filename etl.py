@@ -8,211 +8,471 @@ optimisation, feature engineering, and final validation.
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional – skipped on Vercel to stay under the size limit
+    pa = None
+    pc = None
+
 import config
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+pd.set_option("mode.copy_on_write", True)
+
+# Runs of anything other than lowercase letters/digits collapse to one "_".
+_COL_RE = re.compile(r"[^a-z0-9]+")
+
+# Explicit formats tried against a sample of each object column before
+# falling back to pandas' per-element format inference. Month-first comes
+# before day-first, matching pandas' default for ambiguous dates such as
+# 03/04/2024; day-first only wins when it parses more of the sample (e.g.
+# a day above 12).
+_DATE_FORMATS: tuple[str, ...] = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+)
+_DATE_SAMPLE_SIZE: int = 100
+
+# Narrowest-first integer targets and the float32 tolerance pandas itself
+# applies for ``pd.to_numeric(..., downcast=...)``.
+_INT_DOWNCASTS: tuple[str, ...] = ("int8", "int16", "int32", "int64")
+_FLOAT32_ATOL: float = 5e-4
+
+# Date parts added by feature_engineering and their (NaT-free) dtypes.
+_DATE_PART_DTYPES: tuple[tuple[str, str], ...] = (
+    ("year", "int16"),
+    ("month", "int8"),
+    ("day", "int8"),
+)
+_DATE_MIN_RATIO: float = 0.6
+
+# Part of the run_etl_cached memo key; bump whenever cleaning logic or the
+# summary format changes so stored results from older code are recomputed.
+_PIPELINE_VERSION: int = 1
+
+
+def _best_date_format(sample: pd.Series) -> str | None:
+    """Return the explicit format that parses most of ``sample``, if any.
+
+    Uses ``pyarrow.compute.strptime`` when pyarrow is installed, otherwise
+    ``pd.to_datetime`` with each fixed format. An Arrow winner is
+    re-checked with pandas, which does the full conversion.
+
+    Args:
+        sample: Non-null string values from one column.
+
+    Returns:
+        Best format string, or ``None`` if none parses more than
+        ``_DATE_MIN_RATIO`` of the sample.
+    """
+    best_fmt, best_ratio = None, _DATE_MIN_RATIO
+    arr = None
+    if pc is not None:
+        try:
+            arr = pa.array(sample.tolist(), type=pa.string())
+        except (pa.ArrowException, TypeError):
+            arr = None
+    for fmt in _DATE_FORMATS:
+        if arr is not None:
+            parsed = pc.strptime(arr, format=fmt, unit="ms", error_is_null=True)
+            ratio = 1 - parsed.null_count / len(arr)
+        else:
+            parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+            ratio = parsed.notna().sum() / len(sample)
+        if ratio > best_ratio:
+            best_fmt, best_ratio = fmt, ratio
+            if ratio == 1:
+                break
+    if arr is not None and best_fmt is not None:
+        # Arrow's strptime is laxer than pandas' (it takes 2-digit years for
+        # %Y), so confirm the winner parses as well before the full column
+        # is converted with it.
+        parsed = pd.to_datetime(sample, format=best_fmt, errors="coerce")
+        if parsed.notna().sum() / len(sample) < best_ratio:
+            return None
+    return best_fmt
+
+
+def _strip_strings(s: pd.Series) -> pd.Series:
+    """Strip whitespace from the ``str`` values of an object column.
+
+    All-string columns use the vectorised ``str.strip`` (which propagates
+    NaN itself); mixed columns – e.g. bools with a blank cell – only strip
+    their string elements and keep everything else as-is.
+
+    Args:
+        s: Object-dtype column.
+
+    Returns:
+        Column with string values stripped.
+    """
+    if pd.api.types.infer_dtype(s, skipna=True) == "string":
+        return s.str.strip()
+    return s.map(lambda v: v.strip() if isinstance(v, str) else v)
+
+
+def _format_step(step: dict[str, Any]) -> str:
+    """Render a recorded step as a message such as ``removed_duplicates (3 rows)``.
+
+    The step's ``detail`` template may use ``{count}``, ``{n}`` (number of
+    columns), ``{columns}`` (comma-joined names) and ``{pct}`` (``count`` as
+    a percentage of ``total``).
+    """
+    if not step["detail"]:
+        return step["label"]
+    columns = step["columns"]
+    pct = step["count"] / step["total"] * 100 if step["total"] else 0.0
+    detail = step["detail"].format(
+        count=step["count"], n=len(columns), columns=", ".join(columns), pct=pct,
+    )
+    return f"{step['label']} ({detail})"
+
+
+def _merge_steps(steps: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Combine steps recorded by several pipelines, e.g. one per chunk.
+
+    Steps with the same label are merged: ``count`` and ``total`` are
+    summed and ``columns`` are unioned, so a per-column step counts each
+    column once however many chunks touched it.
+
+    Args:
+        steps: Steps from every pipeline, in order.
+
+    Returns:
+        Merged steps, in first-seen order.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for step in steps:
+        into = merged.get(step["label"])
+        if into is None:
+            merged[step["label"]] = {**step, "columns": list(step["columns"])}
+            continue
+        into["count"] += step["count"]
+        into["total"] += step["total"]
+        into["columns"].extend(c for c in step["columns"] if c not in into["columns"])
+    return list(merged.values())
+
 
 class ETLPipeline:
     """Stateful ETL pipeline that records every transformation applied.
 
     Attributes:
         df: Working DataFrame.
-        original_memory: Memory usage of the input DataFrame in bytes.
-        transformations: List of transformation descriptions applied.
+        original_memory: Shallow memory usage of the input DataFrame in bytes
+            (object columns counted by pointer size only).
+        steps: Transformations applied, as dicts of ``label``, ``detail``
+            template, ``count``, ``columns`` and ``total``.
+        transformations: The same steps rendered as descriptions.
         outlier_counts: Per-column count of detected outliers.
     """
 
-    def __init__(self, df: pd.DataFrame) -> None:
-        self.df: pd.DataFrame = df.copy()
-        self.original_memory: float = df.memory_usage(deep=True).sum()
-        self.transformations: list[str] = []
+    def __init__(
+        self, df: pd.DataFrame, flag_all_outliers: bool = False, downcast_floats: bool = True,
+    ) -> None:
+        """Wrap ``df`` for cleaning.
+
+        Args:
+            df: Raw input DataFrame (never mutated).
+            flag_all_outliers: Add an ``is_outlier_<col>`` column for every
+                numeric column, even with no outliers, so chunked runs
+                produce the same columns for every chunk.
+            downcast_floats: Let :meth:`optimize_dtypes` move float64
+                columns to float32. Chunked runs turn this off since their
+                output is widened back to float64 anyway.
+        """
+        # Under copy-on-write a shallow copy is enough: data is shared until a
+        # column is rewritten, and the caller's frame is never mutated.
+        self.df: pd.DataFrame = df.copy(deep=False)
+        self._input_df: pd.DataFrame = df
+        self.original_memory: float = df.memory_usage(deep=False).sum()
+        self.steps: list[dict[str, Any]] = []
         self.outlier_counts: dict[str, int] = {}
+        self.flag_all_outliers = flag_all_outliers
+        self.downcast_floats = downcast_floats
+
+    def _record(
+        self,
+        label: str,
+        detail: str = "",
+        count: int = 0,
+        columns: Iterable[str] = (),
+        total: int = 0,
+    ) -> None:
+        """Record an applied transformation (see :func:`_format_step`)."""
+        self.steps.append({
+            "label": label,
+            "detail": detail,
+            "count": int(count),
+            "columns": [str(c) for c in columns],
+            "total": int(total),
+        })
+
+    @property
+    def transformations(self) -> list[str]:
+        """Descriptions of the transformations applied so far."""
+        return [_format_step(step) for step in self.steps]
 
     # ──────────────────── Step 1: Column name standardisation ──────────
     def standardize_columns(self) -> None:
         """Lowercase, replace spaces/special chars with underscores."""
-        rename_map: dict[str, str] = {}
-        for col in self.df.columns:
-            new = col.strip().lower()
-            new = re.sub(r"[^a-z0-9_]", "_", new)
-            new = re.sub(r"_+", "_", new).strip("_")
-            if new != col:
-                rename_map[col] = new
-        if rename_map:
-            self.df.rename(columns=rename_map, inplace=True)
-            self.transformations.append(
-                f"standardized_column_names ({len(rename_map)} renamed)"
-            )
+        old_cols = list(self.df.columns)
+        new_cols = [_COL_RE.sub("_", str(c).strip().lower()).strip("_") for c in old_cols]
+        if new_cols != old_cols:
+            rename_map = {old: new for old, new in zip(old_cols, new_cols) if old != new}
+            self.df.columns = new_cols
+            self._record("standardized_column_names", "{n} renamed", columns=rename_map)
             logger.info("Renamed columns: %s", rename_map)
 
     # ──────────────────── Step 2: Trim string fields ──────────────────
     def trim_strings(self) -> None:
         """Strip leading/trailing whitespace from object columns."""
         obj_cols = self.df.select_dtypes(include=["object"]).columns.tolist()
-        for col in obj_cols:
-            self.df[col] = self.df[col].astype(str).str.strip()
-            # Restore NaN where it was 'nan' string
-            self.df[col] = self.df[col].replace({"nan": np.nan, "None": np.nan, "": np.nan})
         if obj_cols:
-            self.transformations.append(
-                f"trimmed_string_fields ({len(obj_cols)} columns)"
-            )
+            stripped = self.df[obj_cols].apply(_strip_strings)
+            self.df[obj_cols] = stripped.mask(stripped.isin(["nan", "None", ""]))
+            self._record("trimmed_string_fields", "{n} columns", columns=obj_cols)
 
     # ──────────────────── Step 3: Remove duplicates ───────────────────
     def remove_duplicates(self) -> None:
         """Drop duplicate rows, keep first occurrence."""
         before = len(self.df)
-        self.df.drop_duplicates(inplace=True)
-        self.df.reset_index(drop=True, inplace=True)
+        self.df = self.df.drop_duplicates().reset_index(drop=True)
         removed = before - len(self.df)
         if removed > 0:
-            self.transformations.append(f"removed_duplicates ({removed} rows)")
+            self._record("removed_duplicates", "{count} rows", count=removed)
             logger.info("Removed %d duplicate rows", removed)
 
     # ──────────────────── Step 4: Handle missing values ───────────────
     def handle_missing_values(self) -> None:
-        """Impute missing values based on column dtype and skewness."""
-        for col in self.df.columns:
-            missing = int(self.df[col].isna().sum())
-            if missing == 0:
-                continue
+        """Impute missing values based on column dtype and skewness.
 
+        Numeric and categorical columns are filled in one batched
+        ``fillna`` each; datetime columns are handled per column because
+        they may drop rows.
+        """
+        na_counts = self.df.isna().sum()
+        missing_cols = na_counts[na_counts > 0].index.tolist()
+        if not missing_cols:
+            return
+
+        num_cols: list[str] = []
+        dt_cols: list[str] = []
+        cat_cols: list[str] = []
+        for col in missing_cols:
             dtype = self.df[col].dtype
-
             if pd.api.types.is_numeric_dtype(dtype):
-                skew_val = self.df[col].skew()
-                if abs(skew_val) > config.SKEWNESS_THRESHOLD:
-                    fill = self.df[col].median()
-                    strategy = "median (skewed)"
-                else:
-                    fill = self.df[col].mean()
-                    strategy = "mean"
-                self.df[col].fillna(fill, inplace=True)
-                self.transformations.append(
-                    f"filled_missing_{col}_with_{strategy} ({missing} values)"
-                )
-
+                num_cols.append(col)
             elif pd.api.types.is_datetime64_any_dtype(dtype):
-                pct_missing = missing / len(self.df) * 100
-                if pct_missing < config.DATETIME_MISSING_DROP_PCT:
-                    self.df.dropna(subset=[col], inplace=True)
-                    self.df.reset_index(drop=True, inplace=True)
-                    self.transformations.append(
-                        f"dropped_missing_datetime_{col} ({missing} rows, {pct_missing:.1f}%)"
-                    )
-                else:
-                    self.df[col].ffill(inplace=True)
-                    self.transformations.append(
-                        f"forward_filled_datetime_{col} ({missing} values)"
-                    )
-
+                dt_cols.append(col)
             else:  # categorical / object / bool
-                mode_val = self.df[col].mode()
-                if not mode_val.empty:
-                    self.df[col].fillna(mode_val.iloc[0], inplace=True)
-                    self.transformations.append(
-                        f"filled_missing_{col}_with_mode ({missing} values)"
-                    )
+                cat_cols.append(col)
+
+        steps: dict[str, dict[str, Any]] = {}
+
+        if num_cols:
+            num_df = self.df[num_cols]
+            use_median = num_df.skew().abs() > config.SKEWNESS_THRESHOLD
+            fill = num_df.median().where(use_median, num_df.mean())
+            self.df[num_cols] = num_df.fillna(fill)
+            for col in num_cols:
+                strategy = "median (skewed)" if use_median[col] else "mean"
+                steps[col] = {
+                    "label": f"filled_missing_{col}_with_{strategy}",
+                    "detail": "{count} values", "count": int(na_counts[col]),
+                }
+
+        if cat_cols:
+            modes = self.df[cat_cols].mode()
+            if not modes.empty:
+                fill = modes.iloc[0].dropna()
+                fill_cols = fill.index.tolist()
+                self.df[fill_cols] = self.df[fill_cols].fillna(fill)
+                for col in fill_cols:
+                    steps[col] = {
+                        "label": f"filled_missing_{col}_with_mode",
+                        "detail": "{count} values", "count": int(na_counts[col]),
+                    }
+
+        for col in dt_cols:
+            missing = int(self.df[col].isna().sum())
+            pct_missing = missing / len(self.df) * 100
+            if pct_missing < config.DATETIME_MISSING_DROP_PCT:
+                steps[col] = {
+                    "label": f"dropped_missing_datetime_{col}",
+                    "detail": "{count} rows, {pct:.1f}%", "count": missing, "total": len(self.df),
+                }
+                self.df = self.df.dropna(subset=[col]).reset_index(drop=True)
+            else:
+                self.df[col] = self.df[col].ffill()
+                steps[col] = {
+                    "label": f"forward_filled_datetime_{col}",
+                    "detail": "{count} values", "count": missing,
+                }
+
+        for col in missing_cols:
+            if col in steps:
+                self._record(**steps[col])
 
     # ──────────────────── Step 5: Convert date-like columns ───────────
     def convert_dates(self) -> None:
-        """Attempt to convert object columns that look like dates."""
+        """Attempt to convert object columns that look like dates.
+
+        A sample of each column is matched against ``_DATE_FORMATS``; the
+        full column is then parsed once with the winning explicit format.
+        pandas' format inference is only used when no fixed format fits.
+        """
         obj_cols = self.df.select_dtypes(include=["object"]).columns.tolist()
         converted: list[str] = []
         for col in obj_cols:
-            sample = self.df[col].dropna().head(50)
+            sample = self.df[col].dropna().head(_DATE_SAMPLE_SIZE)
             if sample.empty:
                 continue
             try:
-                parsed = pd.to_datetime(sample, errors="coerce", infer_datetime_format=True)
-                ratio = parsed.notna().sum() / len(sample)
-                if ratio > 0.6:
-                    self.df[col] = pd.to_datetime(self.df[col], errors="coerce", infer_datetime_format=True)
-                    converted.append(col)
+                fmt = _best_date_format(sample)
+                if fmt is None:
+                    parsed = pd.to_datetime(sample, errors="coerce")
+                    if parsed.notna().sum() / len(sample) <= _DATE_MIN_RATIO:
+                        continue
+                self.df[col] = pd.to_datetime(self.df[col], format=fmt, errors="coerce")
+                converted.append(col)
             except Exception:
                 continue
         if converted:
-            self.transformations.append(
-                f"converted_to_datetime ({', '.join(converted)})"
-            )
+            self._record("converted_to_datetime", "{columns}", columns=converted)
             logger.info("Date columns converted: %s", converted)
 
     # ──────────────────── Step 6: Outlier detection (IQR) ─────────────
     def detect_outliers(self) -> None:
         """Flag outliers using Inter-Quartile Range method."""
-        num_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        for col in num_cols:
-            q1 = self.df[col].quantile(0.25)
-            q3 = self.df[col].quantile(0.75)
-            iqr = q3 - q1
-            if iqr == 0:
-                continue
-            lower = q1 - config.IQR_MULTIPLIER * iqr
-            upper = q3 + config.IQR_MULTIPLIER * iqr
-            outlier_mask = (self.df[col] < lower) | (self.df[col] > upper)
-            count = int(outlier_mask.sum())
-            if count > 0:
-                self.df[f"is_outlier_{col}"] = outlier_mask.astype(int)
-                self.outlier_counts[col] = count
+        num = self.df.select_dtypes(include=[np.number])
+        if num.columns.empty:
+            return
+        quartiles = num.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        lower = q1 - config.IQR_MULTIPLIER * iqr
+        upper = q3 + config.IQR_MULTIPLIER * iqr
+        mask = (num.lt(lower, axis=1) | num.gt(upper, axis=1)) & (iqr != 0)
+        counts = mask.sum()
+        flagged = counts.index.tolist() if self.flag_all_outliers else counts[counts > 0].index.tolist()
+        if flagged:
+            flags = mask[flagged].astype("int8")
+            flags.columns = [f"is_outlier_{c}" for c in flagged]
+            # Overwrite flags already present, e.g. in a re-uploaded output file
+            self.df = pd.concat([self.df.drop(columns=flags.columns, errors="ignore"), flags], axis=1)
+            self.outlier_counts = {c: int(counts[c]) for c in flagged if counts[c] > 0}
         if self.outlier_counts:
-            self.transformations.append(
-                f"detected_outliers ({sum(self.outlier_counts.values())} total across {len(self.outlier_counts)} columns)"
+            self._record(
+                "detected_outliers", "{count} total across {n} columns",
+                count=sum(self.outlier_counts.values()), columns=self.outlier_counts,
             )
 
     # ──────────────────── Step 7: Dtype optimisation ──────────────────
     def optimize_dtypes(self) -> None:
-        """Downcast numeric columns to reduce memory."""
-        for col in self.df.select_dtypes(include=["int64", "int32"]).columns:
-            self.df[col] = pd.to_numeric(self.df[col], downcast="integer")
-        for col in self.df.select_dtypes(include=["float64"]).columns:
-            if not col.startswith("is_outlier_"):
-                self.df[col] = pd.to_numeric(self.df[col], downcast="float")
-        self.transformations.append("optimized_dtypes")
+        """Downcast numeric columns to reduce memory.
+
+        Integer ranges come from one min/max pass over all integer columns;
+        float64 columns move to float32 when every value survives the cast
+        within pandas' ``downcast="float"`` tolerance. All casts are then
+        applied in a single ``astype`` call.
+        """
+        dtype_map: dict[str, str] = {}
+
+        ints = self.df.select_dtypes(include=["int64", "int32"])
+        if not ints.columns.empty:
+            bounds = ints.agg(["min", "max"])
+            for col in ints.columns:
+                lo, hi = bounds.at["min", col], bounds.at["max", col]
+                for candidate in _INT_DOWNCASTS:
+                    info = np.iinfo(candidate)
+                    if pd.isna(lo) or (info.min <= lo and hi <= info.max):
+                        dtype_map[col] = candidate
+                        break
+
+        floats = self.df.select_dtypes(include=["float64"])
+        floats = floats[[c for c in floats.columns if not c.startswith("is_outlier_")]]
+        if self.downcast_floats and not floats.columns.empty:
+            arr = floats.to_numpy()
+            with np.errstate(over="ignore"):
+                arr32 = arr.astype(np.float32)
+            fits = np.isclose(arr32, arr, rtol=0.0, atol=_FLOAT32_ATOL, equal_nan=True).all(axis=0)
+            dtype_map.update({col: "float32" for col, ok in zip(floats.columns, fits) if ok})
+
+        dtype_map = {c: t for c, t in dtype_map.items() if self.df[c].dtype != t}
+        if dtype_map:
+            self.df = self.df.astype(dtype_map)
+        self._record("optimized_dtypes")
 
     # ──────────────────── Step 8: Feature engineering ─────────────────
     def feature_engineering(self) -> None:
         """Extract date parts and create computed columns where logical."""
         dt_cols = self.df.select_dtypes(include=["datetime64"]).columns.tolist()
+        parts: dict[str, pd.Series] = {}
         for col in dt_cols:
-            self.df[f"{col}_year"] = self.df[col].dt.year
-            self.df[f"{col}_month"] = self.df[col].dt.month
-            self.df[f"{col}_day"] = self.df[col].dt.day
-            self.transformations.append(f"extracted_date_parts_from_{col}")
+            dt = self.df[col].dt
+            # NaT yields NaN parts, which the narrow int types cannot hold
+            has_nat = bool(self.df[col].isna().any())
+            for part, dtype in _DATE_PART_DTYPES:
+                parts[f"{col}_{part}"] = getattr(dt, part).astype("float32" if has_nat else dtype)
+            self._record(f"extracted_date_parts_from_{col}")
+        if parts:
+            existing = [c for c in parts if c in self.df.columns]
+            self.df = pd.concat(
+                [self.df.drop(columns=existing), pd.DataFrame(parts, index=self.df.index)],
+                axis=1,
+            )
 
         cols_lower = {c.lower(): c for c in self.df.columns}
         price_col = cols_lower.get("price") or cols_lower.get("total_price")
         qty_col = cols_lower.get("quantity") or cols_lower.get("qty")
         if price_col and qty_col:
             if pd.api.types.is_numeric_dtype(self.df[price_col]) and pd.api.types.is_numeric_dtype(self.df[qty_col]):
-                mask = self.df[qty_col] != 0
-                self.df.loc[mask, "price_per_unit"] = (
-                    self.df.loc[mask, price_col] / self.df.loc[mask, qty_col]
-                )
-                self.transformations.append("created_price_per_unit")
+                price = self.df[price_col].to_numpy()
+                qty = self.df[qty_col].to_numpy()
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self.df["price_per_unit"] = np.where(qty != 0, price / qty, np.nan)
+                self._record("created_price_per_unit")
 
     # ──────────────────── Step 9: Final validation ────────────────────
     def validate_output(self) -> None:
         """Ensure no all-null columns or infinite values remain."""
-        # Replace infinities
-        inf_count = int(np.isinf(self.df.select_dtypes(include=[np.number])).sum().sum())
-        if inf_count > 0:
-            self.df.replace([np.inf, -np.inf], np.nan, inplace=True)
-            self.transformations.append(f"replaced_infinities ({inf_count})")
+        # Replace infinities (only float columns can hold them)
+        floats = self.df.select_dtypes(include=[np.floating])
+        if not floats.columns.empty:
+            inf_mask = np.isinf(floats.to_numpy())
+            if inf_mask.any():
+                inf_count = int(inf_mask.sum())
+                self.df[floats.columns] = floats.mask(inf_mask)
+                self._record("replaced_infinities", "{count}", count=inf_count)
 
         # Drop columns that became entirely null
         null_cols = [c for c in self.df.columns if self.df[c].isna().all()]
         if null_cols:
-            self.df.drop(columns=null_cols, inplace=True)
-            self.transformations.append(f"dropped_all_null_columns ({', '.join(null_cols)})")
+            self.df = self.df.drop(columns=null_cols)
+            self._record("dropped_all_null_columns", "{columns}", columns=null_cols)
 
     # ──────────────────── Run full pipeline ────────────────────────────
     def run(self) -> pd.DataFrame:
@@ -234,44 +494,197 @@ class ETLPipeline:
         logger.info("ETL complete – %d transformations applied", len(self.transformations))
         return self.df
 
-    def get_summary(self) -> dict[str, Any]:
+    def get_summary(self, deep: bool = False) -> dict[str, Any]:
         """Return a JSON-serialisable summary of the pipeline run.
 
+        Args:
+            deep: Measure memory with ``memory_usage(deep=True)``, which walks
+                every Python string in object columns. Off by default; the
+                shallow figure skips that O(N) scan.
+
         Returns:
             Summary dictionary.
         """
-        final_memory = self.df.memory_usage(deep=True).sum()
         return {
             "transformations_applied": self.transformations,
             "outliers_detected": self.outlier_counts,
             "rows_after": len(self.df),
             "columns_after": len(self.df.columns),
-            "memory_reduction_mb": round(
-                (self.original_memory - final_memory) / (1024 * 1024), 2
-            ),
+            "memory_reduction_mb": round(self.memory_saved(deep) / (1024 * 1024), 2),
         }
 
+    def memory_saved(self, deep: bool = False) -> float:
+        """Return input minus output memory usage in bytes.
+
+        Args:
+            deep: Measure with ``memory_usage(deep=True)``.
+
+        Returns:
+            Bytes saved (negative if the output is larger).
+        """
+        if deep:
+            original_memory = self._input_df.memory_usage(deep=True).sum()
+        else:
+            original_memory = self.original_memory
+        return float(original_memory - self.df.memory_usage(deep=deep).sum())
+
 
-def run_etl(input_path: Path) -> tuple[pd.DataFrame, dict[str, Any], Path]:
+def run_etl(
+    input_path: Path, deep_memory: bool = False,
+) -> tuple[pd.DataFrame, dict[str, Any], Path]:
     """High-level function: load CSV, run ETL, save result.
 
+    The cleaned data is written as CSV (served by ``/download``) and, when
+    pyarrow is available, as a Parquet sibling read back by ``/insights``.
+
     Args:
         input_path: Path to the original uploaded CSV.
+        deep_memory: Report deep (per-string) memory usage in the summary.
 
     Returns:
         Tuple of (cleaned DataFrame, summary dict, output file path).
     """
-    from utils.file_handler import load_csv
+    from utils.file_handler import load_csv_cached, parquet_path_for, save_csv, save_parquet
 
-    df = load_csv(input_path)
+    df = load_csv_cached(input_path)
     pipeline = ETLPipeline(df)
     cleaned = pipeline.run()
 
     output_name = f"cleaned_{input_path.name}"
     output_path = config.PROCESSED_FOLDER / output_name
-    cleaned.to_csv(str(output_path), index=False)
+    save_csv(cleaned, output_path)
     logger.info("Saved cleaned CSV to %s", output_path)
+    save_parquet(cleaned, parquet_path_for(output_path))
 
-    summary = pipeline.get_summary()
+    summary = pipeline.get_summary(deep=deep_memory)
     summary["processed_file"] = output_name
     return cleaned, summary, output_path
+
+
+def run_etl_chunked(
+    input_path: Path, deep_memory: bool = False,
+) -> tuple[dict[str, Any], Path]:
+    """Run the pipeline over ``ETL_CHUNK_ROWS``-row chunks of a large CSV.
+
+    Each chunk is cleaned by its own :class:`ETLPipeline` and streamed to
+    the CSV and Parquet outputs, so peak memory scales with the chunk size
+    rather than the file. The tradeoff: duplicates are only removed within
+    a chunk, and imputation statistics, outlier quartiles and date formats
+    are computed per chunk rather than over the whole file. The first
+    chunk fixes the output columns.
+
+    Args:
+        input_path: Path to the original uploaded CSV.
+        deep_memory: Report deep (per-string) memory usage in the summary.
+
+    Returns:
+        Tuple of (summary dict, output file path).
+
+    Raises:
+        ValueError: If the file is empty or a later chunk does not fit the
+            schema of the first one.
+    """
+    from utils.file_handler import iter_csv_chunks, parquet_path_for, save_chunks
+
+    steps: list[dict[str, Any]] = []
+    outlier_counts: dict[str, int] = {}
+    memory_saved = 0.0
+    columns_after = 0
+
+    def cleaned_chunks() -> Iterator[pd.DataFrame]:
+        nonlocal memory_saved, columns_after
+        for chunk in iter_csv_chunks(input_path, config.ETL_CHUNK_ROWS):
+            pipeline = ETLPipeline(chunk, flag_all_outliers=True, downcast_floats=False)
+            cleaned = pipeline.run()
+            steps.extend(pipeline.steps)
+            for col, count in pipeline.outlier_counts.items():
+                outlier_counts[col] = outlier_counts.get(col, 0) + count
+            memory_saved += pipeline.memory_saved(deep=deep_memory)
+            columns_after = columns_after or len(cleaned.columns)
+            yield cleaned
+
+    output_name = f"cleaned_{input_path.name}"
+    output_path = config.PROCESSED_FOLDER / output_name
+    rows_after = save_chunks(cleaned_chunks(), output_path, parquet_path_for(output_path))
+
+    return {
+        "transformations_applied": [_format_step(step) for step in _merge_steps(steps)],
+        "outliers_detected": outlier_counts,
+        "rows_after": rows_after,
+        "columns_after": columns_after,
+        "memory_reduction_mb": round(memory_saved / (1024 * 1024), 2),
+        "processed_file": output_name,
+    }, output_path
+
+
+def _file_digest(file_path: Path, chunk_size: int = 64 * 1024) -> str:
+    """Return the BLAKE2b hex digest of a file, read in fixed-size chunks.
+
+    Args:
+        file_path: File to hash.
+        chunk_size: Bytes read per iteration.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_etl_cached(
+    input_path: Path, deep_memory: bool = False,
+) -> tuple[dict[str, Any], Path]:
+    """Run the ETL unless identical content was already processed.
+
+    Files larger than ``ETL_CHUNK_THRESHOLD_BYTES`` go through
+    :func:`run_etl_chunked` when pyarrow is available, falling back to
+    :func:`run_etl` if the chunks cannot be written consistently.
+
+    The summary of every run is stored as ``<digest>.summary.json`` in the
+    processed folder, keyed by the input file's content hash. A later
+    upload with the same bytes returns that summary (and the existing
+    output file) without re-running the pipeline. Deep-memory summaries
+    are stored separately as ``<digest>.deep.summary.json``. The key also
+    carries ``_PIPELINE_VERSION`` (``<digest>.v<N>...``), so a release
+    that changes the pipeline does not serve results of the old one.
+
+    Args:
+        input_path: Path to the original uploaded CSV.
+        deep_memory: Report deep (per-string) memory usage in the summary.
+
+    Returns:
+        Tuple of (summary dict, output file path).
+    """
+    from utils.file_handler import tmp_path_for
+
+    digest = _file_digest(input_path)
+    suffix = ".deep.summary.json" if deep_memory else ".summary.json"
+    summary_path = config.PROCESSED_FOLDER / f"{digest}.v{_PIPELINE_VERSION}{suffix}"
+
+    if summary_path.exists():
+        try:
+            summary = json.loads(summary_path.read_text(encoding="utf-8"))
+            output_path = config.PROCESSED_FOLDER / summary["processed_file"]
+            if output_path.exists():
+                logger.info("ETL cache hit for %s (%s)", input_path.name, digest)
+                return summary, output_path
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable ETL cache entry %s: %s", summary_path.name, exc)
+
+    summary = None
+    if pa is not None and input_path.stat().st_size > config.ETL_CHUNK_THRESHOLD_BYTES:
+        try:
+            summary, output_path = run_etl_chunked(input_path, deep_memory=deep_memory)
+        except ValueError as exc:
+            logger.warning("Chunked ETL failed for %s, processing in memory: %s", input_path.name, exc)
+    if summary is None:
+        _, summary, output_path = run_etl(input_path, deep_memory=deep_memory)
+
+    # Written last, so a cache entry only exists once all outputs do
+    tmp = tmp_path_for(summary_path)
+    tmp.write_text(json.dumps(summary), encoding="utf-8")
+    os.replace(tmp, summary_path)
+    return summary, output_path
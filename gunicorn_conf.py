@@ -0,0 +1,22 @@
+"""
+SmartCSV – Gunicorn configuration.
+
+Usage:
+    gunicorn -c gunicorn_conf.py app:app
+
+``/process`` runs a CPU-bound pandas pipeline that holds the GIL, so
+throughput comes from worker processes; threads keep slow uploads and
+downloads from tying up a whole worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str((os.cpu_count() or 2) * 2 + 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = 120  # ETL on large files can be slow
+
+# Import the app once in the master so config (and the upload/processed
+# directory creation) runs a single time before workers fork.
+preload_app = True
@@ -9,17 +9,22 @@ insights from cleaned data.
 from __future__ import annotations
 
 import math
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, TypeVar
 
 import numpy as np
 import pandas as pd
 # from scipy import stats as scipy_stats (Removed to save size)
 
 import config
+from utils.fast_moments import column_moments
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 # ═══════════════════════════════════════════════════════════════════════
 #  Column classification
@@ -35,48 +40,112 @@ def classify_columns(df: pd.DataFrame) -> dict[str, list[str]]:
         Dict with keys ``numeric``, ``categorical``, ``datetime``.
     """
     result: dict[str, list[str]] = {"numeric": [], "categorical": [], "datetime": []}
-    for col in df.columns:
+    # dtype.kind covers what is_datetime64_any_dtype / is_numeric_dtype test
+    # (pandas extension dtypes such as Int64 report a NumPy kind too)
+    for col, dtype in df.dtypes.items():
         if col.startswith("is_outlier_"):
             continue
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
+        kind = dtype.kind
+        if kind == "M":
             result["datetime"].append(col)
-        elif pd.api.types.is_numeric_dtype(df[col]):
+        elif kind in "biufc":
             result["numeric"].append(col)
         else:
             result["categorical"].append(col)
     return result
 
 
+def _fits_float32(dtype: Any) -> bool:
+    """Whether every value of ``dtype`` is exactly representable as float32."""
+    if dtype.kind == "f":
+        return dtype.itemsize <= 4
+    return dtype.kind in "biu" and dtype.itemsize <= 2
+
+
+def numeric_matrix(df: pd.DataFrame, numeric_cols: list[str]) -> np.ndarray:
+    """Materialise numeric columns once as a float matrix with NaN for missing.
+
+    The matrix is float32 when that is lossless – every column is float32
+    or an integer/bool of at most 16 bits, which is what the ETL's dtype
+    optimisation produces – halving its memory; otherwise float64.
+    Consumers accumulate statistics in float64 either way.
+
+    Args:
+        df: Input DataFrame.
+        numeric_cols: Numeric column names (bool and nullable dtypes allowed).
+
+    Returns:
+        Array of shape ``(len(df), len(numeric_cols))``.
+    """
+    sub = df[numeric_cols]
+    dtype = np.float32 if all(_fits_float32(d) for d in sub.dtypes) else np.float64
+    return sub.to_numpy(dtype, na_value=np.nan)
+
+
+def _map_columns(func: Callable[[T], R | None], items: Iterable[T]) -> list[R]:
+    """Apply ``func`` to each column on a thread pool, keeping order.
+
+    Per-column work is dominated by NumPy / pandas kernels that release
+    the GIL, so threads overlap well. Runs inline when
+    ``INSIGHTS_MAX_WORKERS`` is 1 or there is only one item.
+
+    Args:
+        func: Per-column function; ``None`` results are dropped.
+        items: Column names or indices.
+
+    Returns:
+        Non-``None`` results in input order.
+    """
+    items = list(items)
+    workers = min(config.INSIGHTS_MAX_WORKERS, len(items))
+    if workers <= 1:
+        results = [func(item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, items))
+    return [r for r in results if r is not None]
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  Descriptive statistics
 # ═══════════════════════════════════════════════════════════════════════
 
-def descriptive_stats(df: pd.DataFrame, numeric_cols: list[str]) -> list[dict[str, Any]]:
+def descriptive_stats(
+    df: pd.DataFrame, numeric_cols: list[str], num_arr: np.ndarray | None = None,
+) -> list[dict[str, Any]]:
     """Compute descriptive statistics for numeric columns.
 
     Args:
         df: Input DataFrame.
         numeric_cols: List of numeric column names.
+        num_arr: Precomputed :func:`numeric_matrix` of ``numeric_cols``.
 
     Returns:
         List of stat dictionaries, one per column.
     """
+    if not numeric_cols:
+        return []
+    arr = numeric_matrix(df, numeric_cols) if num_arr is None else num_arr
+    moments = column_moments(arr)
+    present = np.flatnonzero(moments["count"])
+    medians = np.full(len(numeric_cols), np.nan)
+    medians[present] = np.nanmedian(arr[:, present], axis=0)
+    n_rows = len(df)
+
     results: list[dict[str, Any]] = []
-    for col in numeric_cols:
-        series = df[col].dropna()
-        if series.empty:
-            continue
+    for j in present:
+        count = int(moments["count"][j])
         results.append({
-            "column": col,
-            "count": int(series.count()),
-            "mean": round(float(series.mean()), 4),
-            "median": round(float(series.median()), 4),
-            "std": round(float(series.std()), 4),
-            "min": round(float(series.min()), 4),
-            "max": round(float(series.max()), 4),
-            "skewness": round(float(series.skew()), 4),
-            "kurtosis": round(float(series.kurtosis()), 4),
-            "missing_pct": round(float(df[col].isna().sum() / len(df) * 100), 2),
+            "column": numeric_cols[j],
+            "count": count,
+            "mean": round(float(moments["mean"][j]), 4),
+            "median": round(float(medians[j]), 4),
+            "std": round(float(moments["std"][j]), 4),
+            "min": round(float(moments["min"][j]), 4),
+            "max": round(float(moments["max"][j]), 4),
+            "skewness": round(float(moments["skewness"][j]), 4),
+            "kurtosis": round(float(moments["kurtosis"][j]), 4),
+            "missing_pct": round((n_rows - count) / n_rows * 100, 2),
         })
     return results
 
@@ -85,12 +154,15 @@ def descriptive_stats(df: pd.DataFrame, numeric_cols: list[str]) -> list[dict[st
 #  Correlation matrix
 # ═══════════════════════════════════════════════════════════════════════
 
-def correlation_matrix(df: pd.DataFrame, numeric_cols: list[str]) -> dict[str, Any]:
+def correlation_matrix(
+    df: pd.DataFrame, numeric_cols: list[str], num_arr: np.ndarray | None = None,
+) -> dict[str, Any]:
     """Compute Pearson correlation with p-values for numeric columns.
 
     Args:
         df: Input DataFrame.
         numeric_cols: List of numeric column names.
+        num_arr: Precomputed :func:`numeric_matrix` of ``numeric_cols``.
 
     Returns:
         Dict with ``matrix`` (nested dict) and ``significant_pairs`` list.
@@ -98,89 +170,139 @@ def correlation_matrix(df: pd.DataFrame, numeric_cols: list[str]) -> dict[str, A
     if len(numeric_cols) < 2:
         return {"matrix": {}, "significant_pairs": []}
 
-    subset = df[numeric_cols].dropna()
-    corr = subset.corr().round(4)
-    matrix = corr.to_dict()
+    arr = numeric_matrix(df, numeric_cols) if num_arr is None else num_arr
+    complete = arr[~np.isnan(arr).any(axis=1)]  # listwise deletion, like dropna()
+    n = len(complete)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_full = np.corrcoef(complete, rowvar=False)
+    matrix = pd.DataFrame(r_full, index=numeric_cols, columns=numeric_cols).round(4).to_dict()
 
     significant: list[dict[str, Any]] = []
-    seen: set[tuple[str, str]] = set()
-    for i, c1 in enumerate(numeric_cols):
-        for c2 in numeric_cols[i + 1:]:
-            if (c1, c2) in seen:
-                continue
-            seen.add((c1, c2))
-            try:
-                # Use numpy for correlation (r)
-                # p-value approx: t = r * sqrt(n-2) / sqrt(1-r^2)
-                # We'll just use a simple threshold for significant correlation r > 0.5 for Vercel optimization
-                c1_data, c2_data = subset[c1], subset[c2]
-                r = np.corrcoef(c1_data, c2_data)[0, 1]
-                
-                # Simple significance check (r > threshold) instead of full p-value calculation
-                # to avoid scipy dependency
-                if abs(r) >= config.CORRELATION_SIGNIFICANCE: 
-                    # Mock p-value for frontend compatibility (or implement T-distribution CDF if critical)
-                    p = 0.001 if abs(r) > 0.8 else 0.049 
-                    
-                    significant.append({
-                        "col1": c1,
-                        "col2": c2,
-                        "correlation": round(float(r), 4),
-                        "p_value": round(float(p), 6),
-                    })
-            except Exception:
-                continue
+    if n > 2:
+        # Two-sided p-values for all pairs at once: t = r·sqrt(n-2)/sqrt(1-r²)
+        rows, cols = np.triu_indices(len(numeric_cols), 1)
+        r = r_full[rows, cols]
+        dof = n - 2
+        t2 = r * r * dof / np.clip(1.0 - r * r, 1e-300, None)
+        p = _betainc(dof / 2.0, 0.5, dof / (dof + t2))
+        for i in np.flatnonzero(p < config.CORRELATION_SIGNIFICANCE):
+            significant.append({
+                "col1": numeric_cols[rows[i]],
+                "col2": numeric_cols[cols[i]],
+                "correlation": round(float(r[i]), 4),
+                "p_value": round(float(p[i]), 6),
+            })
 
     significant.sort(key=lambda x: abs(x["correlation"]), reverse=True)
     return {"matrix": matrix, "significant_pairs": significant}
 
 
+def _betainc(a: float, b: float, x: np.ndarray) -> np.ndarray:
+    """Regularised incomplete beta function I_x(a, b), vectorised over ``x``.
+
+    Stands in for ``scipy.special.betainc`` (scipy is not shipped); with
+    ``a = dof/2``, ``b = 1/2`` and ``x = dof/(dof+t²)`` it is the two-sided
+    Student-t p-value. NaN inputs propagate.
+
+    Args:
+        a: First shape parameter (> 0).
+        b: Second shape parameter (> 0).
+        x: Points in ``[0, 1]``.
+
+    Returns:
+        Array of I_x(a, b).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    log_beta = math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        front = np.exp(a * np.log(x) + b * np.log1p(-x) - log_beta)
+        # The continued fraction converges fast for x < (a+1)/(a+b+2);
+        # use the symmetry I_x(a, b) = 1 - I_{1-x}(b, a) elsewhere.
+        swap = x > (a + 1.0) / (a + b + 2.0)
+        direct = front * _betacf(a, b, np.where(swap, 0.0, x)) / a
+        mirrored = 1.0 - front * _betacf(b, a, np.where(swap, 1.0 - x, 0.0)) / b
+    return np.clip(np.where(swap, mirrored, direct), 0.0, 1.0)
+
+
+def _betacf(a: float, b: float, x: np.ndarray, max_iter: int = 10_000, eps: float = 1e-14) -> np.ndarray:
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+
+    def _nonzero(v: np.ndarray) -> np.ndarray:
+        return np.where(np.abs(v) < tiny, tiny, v)
+
+    c = np.ones_like(x)
+    d = 1.0 / _nonzero(1.0 - (a + b) * x / (a + 1.0))
+    h = d.copy()
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((a - 1.0 + m2) * (a + m2))
+        d = 1.0 / _nonzero(1.0 + aa * d)
+        c = _nonzero(1.0 + aa / c)
+        h *= d * c
+        aa = -(a + m) * (a + b + m) * x / ((a + m2) * (a + 1.0 + m2))
+        d = 1.0 / _nonzero(1.0 + aa * d)
+        c = _nonzero(1.0 + aa / c)
+        delta = d * c
+        h *= delta
+        if not np.any(np.abs(delta - 1.0) >= eps):  # NaN lanes never block convergence
+            break
+    return h
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  Distribution analysis (Freedman-Diaconis binning)
 # ═══════════════════════════════════════════════════════════════════════
 
 def distribution_analysis(
-    df: pd.DataFrame, numeric_cols: list[str],
+    df: pd.DataFrame, numeric_cols: list[str], num_arr: np.ndarray | None = None,
 ) -> list[dict[str, Any]]:
     """Compute histogram bins using Freedman-Diaconis rule.
 
     Args:
         df: Input DataFrame.
         numeric_cols: Numeric column names.
+        num_arr: Precomputed :func:`numeric_matrix` of ``numeric_cols``.
 
     Returns:
         List of dicts with ``column``, ``bins``, ``counts``.
     """
-    results: list[dict[str, Any]] = []
-    for col in numeric_cols:
-        series = df[col].dropna()
-        if series.empty or len(series) < 2:
-            continue
+    matrix = numeric_matrix(df, numeric_cols) if num_arr is None else num_arr
+    present = ~np.isnan(matrix)
+
+    def one_column(j: int) -> dict[str, Any] | None:
+        col = numeric_cols[j]
+        # float64 per column keeps bin edges independent of the matrix dtype
+        arr = matrix[present[:, j], j].astype(np.float64)
+        if arr.size < 2:
+            return None
         try:
-            iqr = float(series.quantile(0.75) - series.quantile(0.25))
-            n = len(series)
+            lo, hi = float(arr.min()), float(arr.max())
+            q1, q3 = np.percentile(arr, [25, 75])
+            iqr = float(q3 - q1)
+            # Freedman-Diaconis bin count from the IQR alone – building every
+            # FD edge first can need gigabytes for one extreme outlier
             if iqr > 0:
-                bin_width = 2 * iqr * (n ** (-1 / 3))
-                n_bins = max(1, int(math.ceil((series.max() - series.min()) / bin_width)))
+                bin_width = 2 * iqr * arr.size ** (-1 / 3)
+                n_bins = math.ceil((hi - lo) / bin_width)
             else:
-                n_bins = max(1, int(math.sqrt(n)))
-            n_bins = min(n_bins, 50)  # cap for UI
-            counts, edges = np.histogram(series, bins=n_bins)
-            labels = [f"{edges[i]:.2f}-{edges[i+1]:.2f}" for i in range(len(counts))]
-            results.append({
+                n_bins = int(math.sqrt(arr.size))
+            n_bins = min(max(n_bins, 1), 50)  # cap for UI
+            # Scalar bins + range keeps numpy on its O(n) uniform-bin path
+            counts, edges = np.histogram(arr, bins=n_bins, range=(lo, hi))
+            labels = [f"{a:.2f}-{b:.2f}" for a, b in zip(edges[:-1], edges[1:])]
+            return {
                 "column": col,
                 "bins": labels,
                 "counts": counts.tolist(),
                 "n_bins": n_bins,
-            })
+            }
         except Exception as exc:
             logger.warning("Distribution analysis failed for %s: %s", col, exc)
-    return results
+            return None
 
+    return _map_columns(one_column, range(len(numeric_cols)))
 
-# ═══════════════════════════════════════════════════════════════════════
-#  Frequency tables
-# ═══════════════════════════════════════════════════════════════════════
 
 def frequency_tables(
     df: pd.DataFrame, categorical_cols: list[str],
@@ -194,18 +316,24 @@ def frequency_tables(
     Returns:
         List of dicts with ``column``, ``values``, ``counts``, ``percentages``.
     """
-    results: list[dict[str, Any]] = []
-    for col in categorical_cols:
-        vc = df[col].value_counts().head(config.TOP_N_CATEGORIES)
-        total = int(df[col].notna().sum())
-        results.append({
+    def one_column(col: str) -> dict[str, Any]:
+        # One hash pass: codes are -1 for missing, uniques exclude NaN
+        codes, uniques = pd.factorize(df[col], sort=False)
+        valid = codes[codes >= 0]
+        counts = np.bincount(valid, minlength=len(uniques))
+        # Stable sort keeps first-seen order for ties, like value_counts
+        order = np.argsort(-counts, kind="stable")[:config.TOP_N_CATEGORIES]
+        top_counts = counts[order].tolist()
+        total = len(valid)
+        return {
             "column": col,
-            "values": vc.index.tolist(),
-            "counts": vc.values.tolist(),
-            "percentages": [round(c / total * 100, 1) if total else 0 for c in vc.values],
-            "unique_count": int(df[col].nunique()),
-        })
-    return results
+            "values": uniques[order].tolist(),
+            "counts": top_counts,
+            "percentages": [round(c / total * 100, 1) if total else 0 for c in top_counts],
+            "unique_count": len(uniques),
+        }
+
+    return _map_columns(one_column, categorical_cols)
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -230,6 +358,25 @@ def _build_chart_config(
     return cfg
 
 
+def _top_n(series: pd.Series, n: int) -> pd.Series:
+    """Return the ``n`` largest values in descending order without a full sort.
+
+    Args:
+        series: Values to rank (no NaN).
+        n: Number of entries to keep.
+
+    Returns:
+        Series slice, ties kept in their original order.
+    """
+    vals = series.to_numpy()
+    if len(vals) > n:
+        idx = np.argpartition(-vals, n - 1)[:n]
+    else:
+        idx = np.arange(len(vals))
+    idx = idx[np.lexsort((idx, -vals[idx]))]
+    return series.iloc[idx]
+
+
 def auto_select_charts(
     df: pd.DataFrame,
     col_types: dict[str, list[str]],
@@ -262,21 +409,26 @@ def auto_select_charts(
     ]
 
     # ── Time series: datetime + numeric → line chart
-    for dt_col in datetime_cols:
+    for dt_col in datetime_cols if numeric else []:
+        # Sort and format the dates once, then mask per numeric column
+        base = df[[dt_col, *numeric[:3]]].dropna(subset=[dt_col]).sort_values(dt_col, kind="stable")
+        labels_all = base[dt_col].dt.strftime("%Y-%m-%d").to_numpy()
         for num_col in numeric[:3]:
-            sorted_df = df[[dt_col, num_col]].dropna().sort_values(dt_col)
-            if len(sorted_df) < 2:
+            column = base[num_col].to_numpy(np.float64, na_value=np.nan)
+            present = ~np.isnan(column)
+            n_points = int(present.sum())
+            if n_points < 2:
                 continue
-            labels = sorted_df[dt_col].dt.strftime("%Y-%m-%d").tolist()
             # Subsample if too many points
-            if len(labels) > 200:
-                step = len(labels) // 200
-                labels = labels[::step]
-                values = sorted_df[num_col].tolist()[::step]
+            step = n_points // 200 if n_points > 200 else 1
+            labels = labels_all[present][::step].tolist()
+            values = column[present][::step]
+            if base[num_col].dtype == np.float32:
+                # Shortest float32 repr hides widening noise (46.85f →
+                # 46.849998...) without zeroing small values like 1.2e-5
+                values = [float(np.format_float_positional(np.float32(v))) for v in values]
             else:
-                values = sorted_df[num_col].tolist()
-            # Convert numpy types to native Python
-            values = [float(v) if not (isinstance(v, float) and math.isnan(v)) else 0 for v in values]
+                values = values.tolist()
             charts.append(_build_chart_config(
                 "line",
                 f"{num_col} over time",
@@ -289,7 +441,8 @@ def auto_select_charts(
     # ── Categorical + numeric → bar chart
     for cat_col in categorical[:3]:
         for num_col in numeric[:2]:
-            grouped = df.groupby(cat_col)[num_col].mean().nlargest(config.TOP_N_CATEGORIES)
+            means = df.groupby(cat_col, observed=True, sort=False)[num_col].mean()
+            grouped = _top_n(means.dropna(), config.TOP_N_CATEGORIES)
             if grouped.empty:
                 continue
             charts.append(_build_chart_config(
@@ -316,11 +469,13 @@ def auto_select_charts(
 
     # ── Single numeric → histogram (use distribution data)
     for num_col in numeric[:4]:
-        series = df[num_col].dropna()
-        if len(series) < 2:
+        arr = df[num_col].to_numpy(np.float64, na_value=np.nan)
+        arr = arr[~np.isnan(arr)]
+        if arr.size < 2:
             continue
-        counts, edges = np.histogram(series, bins=min(30, max(5, int(math.sqrt(len(series))))))
-        labels = [f"{edges[i]:.1f}" for i in range(len(counts))]
+        n_bins = min(30, max(5, int(math.sqrt(arr.size))))
+        counts, edges = np.histogram(arr, bins=n_bins, range=(float(arr.min()), float(arr.max())))
+        labels = [f"{edge:.1f}" for edge in edges[:-1]]
         charts.append(_build_chart_config(
             "bar",
             f"Distribution of {num_col}",
@@ -336,7 +491,9 @@ def auto_select_charts(
             subset = df[[c1, c2]].dropna()
             if len(subset) > 500:
                 subset = subset.sample(500, random_state=42)
-            scatter_data = [{"x": round(float(r[c1]), 4), "y": round(float(r[c2]), 4)} for _, r in subset.iterrows()]
+            xy = np.round(subset.to_numpy(np.float64), 4)
+            # Parallel x/y arrays; the frontend zips them into Chart.js points
+            scatter_data = {"x": xy[:, 0].tolist(), "y": xy[:, 1].tolist()}
             charts.append({
                 "chart_type": "scatter",
                 "title": f"{c1} vs {c2} (r={pair['correlation']:.2f})",
@@ -438,26 +595,20 @@ def generate_nlg_insights(
                 f"({top_pct:.1f}% of records). There are {freq['unique_count']} unique values."
             )
 
-    # ── Time-series trend (simple linear regression)
+    # ── Time-series trend (least-squares slope sign and R²)
     for dt_col in col_types["datetime"]:
         for num_col in col_types["numeric"][:2]:
             sub = df[[dt_col, num_col]].dropna().sort_values(dt_col)
             if len(sub) < 10:
                 continue
             try:
-                x = np.arange(len(sub), dtype=float)
-                y = sub[num_col].values.astype(float)
-                # slope, intercept, r_value, _, _ = scipy_stats.linregress(x, y)
-                # Numpy equivalent:
-                slope, intercept = np.polyfit(x, y, 1)
-                
-                # Calculate r_squared
-                y_pred = slope * x + intercept
-                ss_res = np.sum((y - y_pred) ** 2)
-                ss_tot = np.sum((y - np.mean(y)) ** 2)
-                r_sq = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-                
-                trend = "upward" if slope > 0 else "downward"
+                x = np.arange(len(sub), dtype=np.float64)
+                y = sub[num_col].to_numpy(np.float64)
+                # Only the slope's sign and R² are reported: sign(slope) is
+                # sign(cov(x, y)) and R² of a simple linear fit is r².
+                (var_x, cov_xy), (_, var_y) = np.cov(x, y, bias=True)
+                r_sq = cov_xy * cov_xy / (var_x * var_y) if var_y > 0 else 0
+                trend = "upward" if cov_xy > 0 else "downward"
                 insights.append(
                     f"'{num_col}' shows a {trend} trend over time "
                     f"(R² = {r_sq:.2f})."
@@ -484,9 +635,10 @@ def generate_full_insights(df: pd.DataFrame) -> dict[str, Any]:
     logger.info("Generating insights for %d rows × %d cols", len(df), len(df.columns))
 
     col_types = classify_columns(df)
-    stats = descriptive_stats(df, col_types["numeric"])
-    corr = correlation_matrix(df, col_types["numeric"])
-    dist = distribution_analysis(df, col_types["numeric"])
+    num_arr = numeric_matrix(df, col_types["numeric"])
+    stats = descriptive_stats(df, col_types["numeric"], num_arr)
+    corr = correlation_matrix(df, col_types["numeric"], num_arr)
+    dist = distribution_analysis(df, col_types["numeric"], num_arr)
     freq = frequency_tables(df, col_types["categorical"])
     charts = auto_select_charts(df, col_types, corr)
     nlg = generate_nlg_insights(df, col_types, stats, corr, freq)
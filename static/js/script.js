@@ -395,6 +395,13 @@ function renderCharts(charts) {
 
         // Scatter plots need different scale config
         if (cfg.chart_type === 'scatter') {
+            // Server sends parallel {x: [...], y: [...]} arrays; Chart.js wants points
+            cfg.data.datasets.forEach(ds => {
+                if (!Array.isArray(ds.data)) {
+                    const { x, y } = ds.data;
+                    ds.data = x.map((xv, i) => ({ x: xv, y: y[i] }));
+                }
+            });
             chartConfig.options.scales = {
                 x: { grid: { color: gridColor }, type: 'linear', position: 'bottom' },
                 y: { grid: { color: gridColor } },
@@ -0,0 +1,14 @@
+"""Shared pytest setup – puts the app on ``sys.path`` and isolates storage."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Storage folders are read by config at import time, so point them at a
+# throwaway directory before any app module is imported.
+_TMP = Path(tempfile.mkdtemp(prefix="smartcsv-tests-"))
+for _name in ("UPLOAD_FOLDER", "PROCESSED_FOLDER", "LOG_FOLDER", "CACHE_FOLDER"):
+    os.environ.setdefault(_name, str(_TMP / _name.split("_")[0].lower()))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,55 @@
+"""Tests for the Flask app: JSON encoding and upload limits."""
+
+import datetime
+import io
+
+import numpy as np
+import pytest
+
+import app as app_module
+import config
+from app import OrjsonProvider, app
+
+
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_json_provider_with_and_without_orjson(monkeypatch, has_orjson):
+    if has_orjson and app_module.orjson is None:
+        pytest.skip("orjson not installed")
+    if not has_orjson:
+        monkeypatch.setattr(app_module, "orjson", None)
+    provider = OrjsonProvider(app)
+    payload = {"b": [1, 2], "a": "x", "d": datetime.date(2024, 1, 2)}
+
+    with app.app_context():
+        body = provider.response(payload).get_data(as_text=True)
+
+    assert provider.loads(provider.dumps(payload)) == provider.loads(body)
+    assert body.index('"a"') < body.index('"b"')
+    assert "Tue, 02 Jan 2024 00:00:00 GMT" in body
+
+
+def test_json_provider_encodes_numpy():
+    if app_module.orjson is None:
+        pytest.skip("orjson not installed")
+
+    with app.app_context():
+        body = app.json.response({"v": np.arange(3), "m": float("nan")}).get_data(as_text=True)
+
+    assert app.json.loads(body) == {"v": [0, 1, 2], "m": None}
+
+
+def test_upload_raw_chunked_body_over_limit(monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", 1024)
+    before = set(config.UPLOAD_FOLDER.iterdir())
+
+    body = b"a,b\n" + b"1,2\n" * 1024
+
+    response = app.test_client().post(
+        "/upload_raw",
+        input_stream=io.BytesIO(body),
+        headers={"Content-Disposition": 'attachment; filename="big.csv"', "Transfer-Encoding": "chunked"},
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+
+    assert response.status_code == 413
+    assert set(config.UPLOAD_FOLDER.iterdir()) == before
@@ -0,0 +1,118 @@
+"""Tests for the ETL pipeline."""
+
+import pandas as pd
+
+import config
+import etl
+from etl import ETLPipeline, run_etl_chunked
+from utils.file_handler import load_csv
+
+
+def test_trim_strings_keeps_non_string_objects(tmp_path):
+    csv = tmp_path / "flags.csv"
+    csv.write_text("name,active\n  alice ,True\nbob,\ncarol,False\ndave,True\n", encoding="utf-8")
+    df = load_csv(csv)
+
+    cleaned = ETLPipeline(df).run()
+
+    assert cleaned["name"].tolist() == ["alice", "bob", "carol", "dave"]
+    assert cleaned["active"].tolist() == [True, True, False, True]
+
+
+def test_trim_strings_mixed_column():
+    df = pd.DataFrame({"v": pd.Series([" a ", 1, None, True], dtype=object)})
+
+    pipeline = ETLPipeline(df)
+    pipeline.trim_strings()
+
+    assert pipeline.df["v"].tolist()[:2] == ["a", 1]
+    assert pd.isna(pipeline.df["v"].iloc[2])
+    assert pipeline.df["v"].iloc[3] is True
+
+
+def test_rerun_on_own_output_overwrites_outlier_flags():
+    df = pd.DataFrame({"price": [1.0, 2.0, 3.0, 2.5, 1.5, 2.0, 100.0, 2.2]})
+
+    first = ETLPipeline(df).run()
+    second = ETLPipeline(first).run()
+
+    assert "is_outlier_price" in first.columns
+    assert second.columns.is_unique
+    assert second["is_outlier_price"].tolist() == first["is_outlier_price"].tolist()
+
+
+def test_convert_dates_ambiguous_is_month_first():
+    df = pd.DataFrame({"d": ["03/04/2024", "05/06/2024", "01/02/2024"]})
+
+    pipeline = ETLPipeline(df)
+    pipeline.convert_dates()
+
+    assert pipeline.df["d"].tolist() == pd.to_datetime(["2024-03-04", "2024-05-06", "2024-01-02"]).tolist()
+
+
+def test_convert_dates_day_first_when_month_first_fails():
+    df = pd.DataFrame({"d": ["03/04/2024", "25/06/2024", "13/02/2024"]})
+
+    pipeline = ETLPipeline(df)
+    pipeline.convert_dates()
+
+    assert pipeline.df["d"].tolist() == pd.to_datetime(["2024-04-03", "2024-06-25", "2024-02-13"]).tolist()
+
+
+def test_chunked_summary_merges_counts(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ETL_CHUNK_ROWS", 10)
+    monkeypatch.setattr(config, "PROCESSED_FOLDER", tmp_path)
+    rows = []
+    for chunk in range(2):
+        base = chunk * 10
+        rows += [f"{base + i}, name{base + i} ,{base + i}.5" for i in range(7)]
+        rows += [f"{base}, name{base} ,{base}.5"] * 3  # 3 duplicates per chunk
+    csv = tmp_path / "dups.csv"
+    csv.write_text("id,name,score\n" + "\n".join(rows) + "\n", encoding="utf-8")
+
+    summary, output_path = run_etl_chunked(csv)
+
+    applied = summary["transformations_applied"]
+    assert "removed_duplicates (6 rows)" in applied
+    assert "trimmed_string_fields (1 columns)" in applied
+    assert summary["rows_after"] == 14
+    assert pd.read_csv(output_path)["score"].tolist()[:2] == [0.5, 1.5]
+
+
+def test_run_etl_cached_key_includes_pipeline_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROCESSED_FOLDER", tmp_path)
+    csv = tmp_path / "v.csv"
+    csv.write_text("a,b\n1,x\n2,y\n", encoding="utf-8")
+
+    etl.run_etl_cached(csv)
+    monkeypatch.setattr(etl, "_PIPELINE_VERSION", etl._PIPELINE_VERSION + 1)
+    etl.run_etl_cached(csv)
+
+    summaries = sorted(p.name for p in tmp_path.glob("*.summary.json"))
+    assert len(summaries) == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_convert_dates_two_digit_years_fall_back_to_inference():
+    df = pd.DataFrame({"d": ["1/5/24", "2/6/24", "12/25/23"]})
+
+    pipeline = ETLPipeline(df)
+    pipeline.convert_dates()
+
+    assert pipeline.df["d"].tolist() == pd.to_datetime(["2024-01-05", "2024-02-06", "2023-12-25"]).tolist()
+
+
+def test_missing_dates_imputed_the_same_for_any_format(tmp_path):
+    kept = {}
+    for name, dates in {"iso": ["2024-01-0{}", 9], "us": ["01/0{}/2024", 9]}.items():
+        fmt, n = dates
+        values = [fmt.format(i % n + 1) for i in range(40)]
+        values[5] = ""
+        csv = tmp_path / f"{name}.csv"
+        csv.write_text("d,v\n" + "\n".join(f"{d},{i}" for i, d in enumerate(values)) + "\n", encoding="utf-8")
+
+        cleaned = ETLPipeline(load_csv(csv)).run()
+
+        kept[name] = len(cleaned)
+        assert pd.api.types.is_datetime64_any_dtype(cleaned["d"])
+    assert kept == {"iso": 40, "us": 40}
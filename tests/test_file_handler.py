@@ -0,0 +1,161 @@
+"""Tests for CSV loading helpers."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from utils.file_handler import (
+    _read_csv_arrow,
+    detect_encoding,
+    iter_csv_chunks,
+    load_csv,
+    load_csv_cached,
+    save_chunks,
+    save_csv,
+)
+
+
+def _write_multiline_csv(path, rows):
+    lines = ["id,comment"]
+    for i in range(rows):
+        comment = '"first part\nsecond part, with comma"' if i % 50 == 0 else "plain"
+        lines.append(f"{i},{comment}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_load_csv_quoted_newlines_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CSV_READ_BLOCK_SIZE", 64 * 1024)
+    csv = tmp_path / "multiline.csv"
+    _write_multiline_csv(csv, 50_000)
+    assert csv.stat().st_size > config.CSV_READ_BLOCK_SIZE
+
+    df = load_csv(csv)
+
+    assert len(df) == 50_000
+    assert pd.api.types.is_integer_dtype(df["id"])
+    assert df.loc[0, "comment"] == "first part\nsecond part, with comma"
+
+
+def test_iter_csv_chunks_quoted_newlines_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CSV_READ_BLOCK_SIZE", 64 * 1024)
+    csv = tmp_path / "multiline.csv"
+    _write_multiline_csv(csv, 50_000)
+
+    chunks = list(iter_csv_chunks(csv, 20_000))
+
+    assert [len(c) for c in chunks] == [20_000, 20_000, 10_000]
+    assert all(pd.api.types.is_integer_dtype(c["id"]) for c in chunks)
+    assert pd.concat(chunks)["id"].tolist() == list(range(50_000))
+
+
+@pytest.mark.parametrize("text", [
+    "name,city\nJosé Muñoz,España\n",
+    "name\nPeña\n",
+])
+def test_latin1_file_round_trips(tmp_path, text):
+    csv = tmp_path / "latin1.csv"
+    csv.write_bytes(text.encode("latin-1"))
+
+    df = load_csv(csv)
+
+    assert detect_encoding(csv).lower() in {"iso-8859-1", "windows-1252"}
+    expected = pd.read_csv(csv, encoding="latin-1")
+    assert df.equals(expected)
+
+
+def test_utf8_file_detected_without_statistics(tmp_path):
+    csv = tmp_path / "utf8.csv"
+    csv.write_bytes("name,city\nJosé Muñoz,España\n".encode("utf-8"))
+
+    assert detect_encoding(csv) == "utf-8"
+
+
+def test_load_csv_cached_copies_do_not_leak_edits(tmp_path):
+    csv = tmp_path / "cached.csv"
+    csv.write_text("a,b\n1,x\n2,y\n", encoding="utf-8")
+
+    first = load_csv_cached(csv)
+    first.loc[0, "a"] = 99
+    first["b"] = first["b"].str.upper()
+    second = load_csv_cached(csv)
+
+    assert second["a"].tolist() == [1, 2]
+    assert second["b"].tolist() == ["x", "y"]
+
+
+
+def test_arrow_reader_rejects_binary_columns(tmp_path):
+    csv = tmp_path / "bad_utf8.csv"
+    csv.write_bytes("name,city\nJosé,España\nann,Rome\n".encode("latin-1"))
+
+    with pytest.raises(ValueError, match="not decodable"):
+        _read_csv_arrow(csv, "utf-8")
+
+
+@pytest.mark.parametrize("head", ["Paris", "Zürich"])
+def test_latin1_after_the_detection_sample(tmp_path, head):
+    csv = tmp_path / "late_latin1.csv"
+    rows = ["name,city"] + [f"user{i},{head}" for i in range(5_000)]
+    body = ("\n".join(rows) + "\n").encode("utf-8") + "José,España\n".encode("latin-1")
+    csv.write_bytes(body)
+    assert detect_encoding(csv) == "utf-8"
+
+    df = load_csv(csv)
+
+    assert len(df) == 5_001
+    assert all(isinstance(v, str) for v in df["name"])
+    assert df["city"].iloc[-1].startswith("Espa")
+
+
+def test_save_csv_matches_to_csv_byte_for_byte(tmp_path):
+    df = pd.DataFrame({
+        "text": ["a", "b,c", 'q"x', "line\nbreak", "", None],
+        "flag": [True, False, True, True, False, True],
+        "f32": np.array([22.78, 1e10, 0.1, np.nan, 1e-5, 3.0], dtype=np.float32),
+        "f64": [0.1, 1e16, 1e-5, np.nan, 123456789.123, 2.5],
+        "when": pd.date_range("2024-01-01 10:00", periods=6, freq="h", tz="Europe/Berlin"),
+        "day": pd.date_range("2024-01-01", periods=6, freq="D"),
+    })
+    dest = tmp_path / "out.csv"
+
+    save_csv(df, dest)
+
+    assert dest.read_bytes() == df.to_csv(index=False).encode("utf-8")
+
+
+def _timed_chunks():
+    first = pd.DataFrame({
+        "id": [1, 2, 3],
+        "score": [0.1, np.nan, 2.5],
+        "name": ["a", "b,c", None],
+        "day": pd.to_datetime(["2024-01-01", None, "2024-01-03"]),
+    })
+    second = pd.DataFrame({
+        "id": [4],
+        "score": [1e16],
+        "name": ["d"],
+        "day": pd.to_datetime(["2024-02-01"]),
+    })
+    return first, second
+
+
+def test_save_chunks_csv_matches_to_csv(tmp_path):
+    frames = _timed_chunks()
+    csv_dest = tmp_path / "out.csv"
+
+    rows = save_chunks(iter(frames), csv_dest, tmp_path / "out.parquet")
+
+    expected = pd.concat(frames, ignore_index=True).to_csv(index=False)
+    assert rows == 4
+    assert csv_dest.read_text(encoding="utf-8") == expected
+
+
+def test_save_chunks_rejects_times_after_date_only_chunk(tmp_path):
+    first, second = _timed_chunks()
+    second["day"] = pd.to_datetime(["2024-02-01 10:30"])
+    csv_dest = tmp_path / "out.csv"
+
+    with pytest.raises(ValueError, match="'day'"):
+        save_chunks(iter([first, second]), csv_dest, tmp_path / "out.parquet")
+    assert not csv_dest.exists()
@@ -0,0 +1,51 @@
+"""Tests for the insights engine."""
+
+import numpy as np
+import pandas as pd
+
+from insights import auto_select_charts, classify_columns, distribution_analysis
+
+
+def test_distribution_extreme_outlier_is_capped():
+    values = np.random.default_rng(0).normal(size=100_000)
+    values[0] = 1e9
+    df = pd.DataFrame({"v": values})
+
+    [dist] = distribution_analysis(df, ["v"])
+
+    assert dist["column"] == "v"
+    assert dist["n_bins"] == 50
+    assert sum(dist["counts"]) == 100_000
+
+
+def test_distribution_constant_column():
+    df = pd.DataFrame({"v": [3.0] * 16})
+
+    [dist] = distribution_analysis(df, ["v"])
+
+    assert dist["n_bins"] == 4
+    assert sum(dist["counts"]) == 16
+
+
+def test_time_series_values_are_rounded_from_float32():
+    df = pd.DataFrame({
+        "when": pd.date_range("2024-01-01", periods=5, freq="D"),
+        "price": np.array([46.85, 12.3, 7.1, 8.25, 9.99], dtype=np.float32),
+    })
+
+    charts = auto_select_charts(df, classify_columns(df), {})
+
+    [line] = [c for c in charts if c["chart_type"] == "line"]
+    assert line["data"]["datasets"][0]["data"] == [46.85, 12.3, 7.1, 8.25, 9.99]
+
+
+def test_time_series_keeps_small_float32_values():
+    df = pd.DataFrame({
+        "when": pd.date_range("2024-01-01", periods=3, freq="D"),
+        "rate": np.array([1.2e-5, 3.4e-7, 0.5], dtype=np.float32),
+    })
+
+    charts = auto_select_charts(df, classify_columns(df), {})
+
+    [line] = [c for c in charts if c["chart_type"] == "line"]
+    assert line["data"]["datasets"][0]["data"] == [1.2e-5, 3.4e-7, 0.5]
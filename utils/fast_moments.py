@@ -0,0 +1,79 @@
+"""
+Column moments – count, mean, std, skewness, kurtosis, min and max for
+every column of a 2-D array in one set of vectorised passes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# pandas zeroes moment sums below this to hide floating-point noise
+_FP_NOISE: float = 1e-14
+
+
+def _zero_out_noise(arr: np.ndarray) -> np.ndarray:
+    """Replace values with magnitude below ``_FP_NOISE`` by zero."""
+    return np.where(np.abs(arr) < _FP_NOISE, 0.0, arr)
+
+
+def column_moments(arr: np.ndarray) -> dict[str, np.ndarray]:
+    """Compute per-column moments of a 2-D array, ignoring NaN.
+
+    Follows pandas' ``std`` (``ddof=1``), ``skew`` (adjusted Fisher-Pearson)
+    and ``kurt`` (bias-corrected excess kurtosis), including its NaN for too
+    few observations and zero for constant columns, but accumulates every
+    moment in float64.
+
+    Args:
+        arr: Float array of shape ``(rows, columns)``; float32 input is not
+            copied up front, only the per-element deviations are float64.
+
+    Returns:
+        Dict of 1-D arrays keyed by ``count``, ``mean``, ``std``,
+        ``skewness``, ``kurtosis``, ``min`` and ``max``.
+    """
+    arr = np.asarray(arr)
+    if arr.dtype.kind != "f":
+        arr = arr.astype(np.float64)
+    valid = ~np.isnan(arr)
+    count = valid.sum(axis=0)
+    n = count.astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, arr, 0.0).sum(axis=0, dtype=np.float64) / n
+        dev = np.where(valid, arr - mean, 0.0)
+        dev2 = dev * dev
+        m2 = dev2.sum(axis=0)
+        m3 = _zero_out_noise((dev2 * dev).sum(axis=0))
+        m4 = (dev2 * dev2).sum(axis=0)
+        del dev, dev2
+
+        std = np.sqrt(m2 / (n - 1))
+        std[count < 2] = np.nan
+
+        m2_skew = _zero_out_noise(m2)
+        skew = (n * np.sqrt(n - 1) / (n - 2)) * (m3 / m2_skew**1.5)
+        skew = np.where(m2_skew == 0, 0.0, skew)
+        skew[count < 3] = np.nan
+
+        adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        numerator = _zero_out_noise(n * (n + 1) * (n - 1) * m4)
+        denominator = _zero_out_noise((n - 2) * (n - 3) * m2**2)
+        kurt = np.where(denominator == 0, 0.0, numerator / denominator - adj)
+        kurt[count < 4] = np.nan
+
+        any_valid = count > 0
+        lo = np.fmin.reduce(arr, axis=0, initial=np.inf).astype(np.float64)
+        hi = np.fmax.reduce(arr, axis=0, initial=-np.inf).astype(np.float64)
+        col_min = np.where(any_valid, lo, np.nan)
+        col_max = np.where(any_valid, hi, np.nan)
+
+    return {
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "skewness": skew,
+        "kurtosis": kurt,
+        "min": col_min,
+        "max": col_max,
+    }
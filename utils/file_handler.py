@@ -1,22 +1,58 @@
 """
-File I/O utilities – save uploads, load CSVs with encoding detection.
+File I/O utilities – save uploads, load CSVs with encoding detection,
+persist processed output as Parquet.
 """
 
 from __future__ import annotations
 
+import codecs
 import datetime
+import os
+import re
+import shutil
+import threading
 import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterable, Iterator
 
-import chardet
+import numpy as np
 import pandas as pd
 
+# Faster C port of chardet when installed; both return
+# ``{"encoding": ..., "confidence": ...}`` dicts. charset-normalizer is not
+# used: it mislabels short Latin-1 samples as other code pages.
+try:
+    from cchardet import detect as _detect_charset  # optional C extension
+except ImportError:
+    from chardet import detect as _detect_charset
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # optional – skipped on Vercel to stay under the size limit
+    pa = None
+    pa_csv = None
+    pq = None
+
 import config
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# load_csv_cached hands out shallow copies of cached frames; copy-on-write
+# is what keeps callers' edits from reaching the cache.
+pd.set_option("mode.copy_on_write", True)
+
+# Parsed uploads kept per process. Only the upload → process hand-off is
+# served from here (and only when both land on the same worker), so a
+# couple of entries suffice; each one is a full DataFrame.
+_CSV_CACHE_SIZE: int = 2
+
+# \w covers str.isalnum() characters plus "_".
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w-]")
+
 
 def _sanitize_filename(filename: str) -> str:
     """Remove unsafe characters from filename, keep extension.
@@ -29,7 +65,7 @@ def _sanitize_filename(filename: str) -> str:
     """
     stem = Path(filename).stem
     ext = Path(filename).suffix
-    safe = "".join(c if c.isalnum() or c in ("_", "-") else "_" for c in stem)
+    safe = _UNSAFE_FILENAME_RE.sub("_", stem)
     return safe + ext
 
 
@@ -61,19 +97,69 @@ def save_upload(file_storage: BinaryIO, original_filename: str) -> Path:
     Raises:
         ValueError: If extension or MIME type is not allowed.
     """
+    dest = _upload_destination(original_filename)
+    file_storage.save(str(dest))
+    logger.info("Saved upload to %s", dest)
+    return dest
+
+
+def save_upload_stream(stream: BinaryIO, original_filename: str) -> Path:
+    """Copy a raw request body straight to the uploads directory.
+
+    The body is copied in ``UPLOAD_CHUNK_SIZE`` reads with no multipart
+    parsing or intermediate temp file.
+
+    Args:
+        stream: Readable binary stream (e.g. ``request.stream``).
+        original_filename: Original filename.
+
+    Returns:
+        Path to the saved file.
+
+    Raises:
+        ValueError: If the extension is not allowed.
+        werkzeug.exceptions.RequestEntityTooLarge: If a body without
+            ``Content-Length`` grows past ``MAX_CONTENT_LENGTH``; the
+            partial file is removed.
+    """
+    dest = _upload_destination(original_filename)
+    try:
+        with open(dest, "wb") as fh:
+            shutil.copyfileobj(stream, fh, length=config.UPLOAD_CHUNK_SIZE)
+    except Exception:
+        dest.unlink(missing_ok=True)
+        raise
+    logger.info("Streamed upload to %s", dest)
+    return dest
+
+
+def _upload_destination(original_filename: str) -> Path:
+    """Validate the extension and return a unique path in the uploads dir.
+
+    Args:
+        original_filename: Original filename.
+
+    Returns:
+        Destination path for the upload.
+
+    Raises:
+        ValueError: If the extension is not allowed.
+    """
     ext = Path(original_filename).suffix.lower().lstrip(".")
     if ext not in config.ALLOWED_EXTENSIONS:
         raise ValueError(f"Extension '.{ext}' is not allowed. Accepted: {config.ALLOWED_EXTENSIONS}")
+    return config.UPLOAD_FOLDER / generate_unique_filename(original_filename)
 
-    unique_name = generate_unique_filename(original_filename)
-    dest = config.UPLOAD_FOLDER / unique_name
-    file_storage.save(str(dest))
-    logger.info("Saved upload to %s", dest)
-    return dest
 
+def detect_encoding(file_path: Path, sample_size: int = 16384) -> str:
+    """Detect file encoding with cchardet or chardet.
 
-def detect_encoding(file_path: Path, sample_size: int = 65536) -> str:
-    """Detect file encoding using chardet.
+    A byte-order mark, an all-ASCII sample or a sample that decodes as
+    strict UTF-8 is answered directly; the statistical detector only runs
+    on samples those checks cannot settle. Only the first ``sample_size``
+    bytes are seen, so a file can still hold bytes the answer cannot
+    decode further on; :func:`load_csv` then falls back to decoding with
+    replacement characters.
 
     Args:
         file_path: Path to the file.
@@ -84,15 +170,33 @@ def detect_encoding(file_path: Path, sample_size: int = 65536) -> str:
     """
     with open(file_path, "rb") as fh:
         raw = fh.read(sample_size)
-    result = chardet.detect(raw)
+    if raw.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if raw.isascii():
+        return "utf-8"  # ASCII is a subset; bytes past the sample are unchecked
+    try:
+        # final=False tolerates a multi-byte character cut at the sample end
+        codecs.getincrementaldecoder("utf-8")().decode(raw, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    result = _detect_charset(raw)
     encoding = result.get("encoding") or "utf-8"
-    logger.info("Detected encoding: %s (confidence: %.0f%%)", encoding, (result.get("confidence", 0) * 100))
+    logger.info("Detected encoding: %s (confidence: %.0f%%)", encoding, (result.get("confidence") or 0) * 100)
     return encoding
 
 
 def load_csv(file_path: Path) -> pd.DataFrame:
     """Load a CSV file into a DataFrame with encoding detection.
 
+    Uses pyarrow's multithreaded CSV reader when it is installed and falls
+    back to ``pd.read_csv`` if pyarrow is missing or rejects the file.
+    Inferred column types are not cached on disk: an upload is parsed once
+    for ``/upload`` and ``/process`` (see :func:`load_csv_cached`), and
+    ``/insights`` reads the typed Parquet copy instead.
+
     Args:
         file_path: Path to the CSV file.
 
@@ -103,14 +207,425 @@ def load_csv(file_path: Path) -> pd.DataFrame:
         ValueError: If the file cannot be parsed.
     """
     encoding = detect_encoding(file_path)
+    if pa_csv is not None:
+        try:
+            df = _read_csv_arrow(file_path, encoding)
+            logger.info("Loaded CSV with %d rows × %d columns (pyarrow)", len(df), len(df.columns))
+            return df
+        except (pa.ArrowException, UnicodeDecodeError, LookupError, ValueError) as exc:
+            logger.warning("pyarrow CSV parse failed, falling back to pandas: %s", exc)
+
     try:
         df = pd.read_csv(str(file_path), encoding=encoding, low_memory=False)
     except UnicodeDecodeError:
         logger.warning("Encoding %s failed, falling back to utf-8 with errors='replace'", encoding)
-        df = pd.read_csv(str(file_path), encoding="utf-8", errors="replace", low_memory=False)
+        df = pd.read_csv(str(file_path), encoding="utf-8", encoding_errors="replace", low_memory=False)
     except Exception as exc:
         logger.error("Failed to parse CSV: %s", exc)
         raise ValueError(f"Unable to read CSV file: {exc}") from exc
 
     logger.info("Loaded CSV with %d rows × %d columns", len(df), len(df.columns))
     return df
+
+
+def _read_csv_arrow(file_path: Path, encoding: str) -> pd.DataFrame:
+    """Parse a CSV with ``pyarrow.csv.read_csv`` and convert to pandas.
+
+    Columns come back NumPy-backed (not ``ArrowDtype``) since the ETL and
+    insight code select on NumPy dtypes. Columns Arrow would parse as
+    dates or times are re-read as text, like ``pd.read_csv`` leaves them,
+    so missing dates are imputed and converted by the ETL the same way
+    whatever their format.
+
+    Args:
+        file_path: Path to the CSV file.
+        encoding: Source encoding; non-UTF-8 input is transcoded by Arrow.
+
+    Returns:
+        Pandas DataFrame.
+
+    Raises:
+        ValueError: If :func:`_check_arrow_schema` rejects the columns.
+    """
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        block_size=config.CSV_READ_BLOCK_SIZE,
+        encoding=encoding,
+    )
+    # Quoted fields may span lines; without this, block splitting can cut a
+    # row in two.
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+    table = pa_csv.read_csv(
+        str(file_path),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+    _check_arrow_schema(table.schema)
+    text_types = _text_column_types(table.schema)
+    if text_types:
+        text = pa_csv.read_csv(
+            str(file_path),
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=pa_csv.ConvertOptions(
+                strings_can_be_null=True,
+                include_columns=list(text_types),
+                column_types=text_types,
+            ),
+        )
+        for name in text_types:
+            table = table.set_column(table.schema.get_field_index(name), name, text[name])
+    return table.to_pandas(date_as_object=False, self_destruct=True)
+
+
+def _text_column_types(schema: pa.Schema) -> dict[str, pa.DataType]:
+    """Map the temporal columns of an inferred schema to ``pa.string()``."""
+    return {f.name: pa.string() for f in schema if pa.types.is_temporal(f.type)}
+
+
+def _check_arrow_schema(schema: pa.Schema) -> None:
+    """Reject Arrow CSV results that ``pd.read_csv`` would handle better.
+
+    Args:
+        schema: Schema inferred by the Arrow CSV reader.
+
+    Raises:
+        ValueError: On duplicate column names, which ``pd.read_csv`` would
+            mangle instead, or on ``binary`` columns, which Arrow infers
+            when values are not valid in the source encoding (e.g. Latin-1
+            bytes after an ASCII-only detection sample) and which would
+            reach pandas as ``bytes`` objects.
+    """
+    if len(set(schema.names)) != len(schema.names):
+        raise ValueError("duplicate column names")
+    binary = [f.name for f in schema if pa.types.is_binary(f.type) or pa.types.is_large_binary(f.type)]
+    if binary:
+        raise ValueError(f"columns not decodable as the detected encoding: {binary}")
+
+
+def load_csv_cached(file_path: Path) -> pd.DataFrame:
+    """Load a CSV through a small process-local cache.
+
+    Entries are keyed on the path and its ``st_mtime_ns``, so an upload
+    followed by ``/process`` decodes the file only once while a rewritten
+    file is always re-read. At most ``_CSV_CACHE_SIZE`` frames are kept.
+    Callers get a shallow copy; copy-on-write (enabled by this module)
+    keeps their edits from reaching the cached frame.
+
+    Args:
+        file_path: Path to the CSV file.
+
+    Returns:
+        Pandas DataFrame.
+
+    Raises:
+        ValueError: If the file cannot be parsed.
+    """
+    return _load_csv_memo(str(file_path), file_path.stat().st_mtime_ns).copy(deep=False)
+
+
+@lru_cache(maxsize=_CSV_CACHE_SIZE)
+def _load_csv_memo(path: str, mtime_ns: int) -> pd.DataFrame:
+    """Cached worker behind :func:`load_csv_cached` (``mtime_ns`` is key-only)."""
+    return load_csv(Path(path))
+
+
+def save_csv(df: pd.DataFrame, dest: Path) -> None:
+    """Write a DataFrame as CSV for ``/download``.
+
+    Always uses ``DataFrame.to_csv``: pyarrow's CSV writer quotes every
+    string and formats booleans, floats and timezone offsets differently,
+    which would change the downloaded file.
+
+    Args:
+        df: DataFrame to write.
+        dest: Destination ``.csv`` path.
+    """
+    df.to_csv(str(dest), index=False)
+
+
+def parquet_path_for(csv_path: Path) -> Path:
+    """Return the Parquet sibling path for a processed CSV file.
+
+    Args:
+        csv_path: Path to the processed CSV.
+
+    Returns:
+        Path with the same stem and a ``.parquet`` suffix.
+    """
+    return csv_path.with_suffix(".parquet")
+
+
+def tmp_path_for(dest: Path) -> Path:
+    """Return a temporary sibling of ``dest`` unique to this process and thread.
+
+    Writers fill the temporary file and ``os.replace`` it onto ``dest``, so
+    concurrent requests for the same output never share a partial file.
+
+    Args:
+        dest: Final destination path.
+
+    Returns:
+        Path next to ``dest`` ending in ``.<pid>.<thread id>.tmp``.
+    """
+    return dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def save_parquet(df: pd.DataFrame, dest: Path) -> bool:
+    """Write a DataFrame as zstd-compressed Parquet (atomic replace).
+
+    Args:
+        df: DataFrame to persist.
+        dest: Destination ``.parquet`` path.
+
+    Returns:
+        ``True`` if the file was written, ``False`` if pyarrow is missing
+        or the frame could not be converted.
+    """
+    if pq is None:
+        return False
+    tmp = tmp_path_for(dest)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, str(tmp), compression="zstd")
+        os.replace(tmp, dest)
+    except (pa.ArrowException, OSError) as exc:
+        logger.warning("Parquet write failed for %s: %s", dest.name, exc)
+        tmp.unlink(missing_ok=True)
+        return False
+    logger.info("Saved Parquet copy to %s", dest)
+    return True
+
+
+def iter_csv_chunks(file_path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV through ``pyarrow.csv.open_csv`` in ``chunksize`` slices.
+
+    Chunks get the same Arrow type inference as :func:`load_csv`. Column
+    types are inferred from the first block; a later block that does not
+    fit them raises ``pyarrow.ArrowInvalid`` (a ``ValueError``). Requires
+    pyarrow.
+
+    Args:
+        file_path: Path to the CSV file.
+        chunksize: Rows per chunk.
+
+    Yields:
+        NumPy-backed DataFrames of at most ``chunksize`` rows.
+
+    Raises:
+        ValueError: If :func:`_check_arrow_schema` rejects the columns.
+    """
+    encoding = detect_encoding(file_path)
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        block_size=config.CSV_READ_BLOCK_SIZE,
+        encoding=encoding,
+    )
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+    # Types come from the first block; peek at them so temporal columns can
+    # be read as text, as in _read_csv_arrow
+    with pa_csv.open_csv(
+        str(file_path),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    ) as reader:
+        _check_arrow_schema(reader.schema)
+        text_types = _text_column_types(reader.schema)
+    if text_types:
+        convert_options = pa_csv.ConvertOptions(strings_can_be_null=True, column_types=text_types)
+    with pa_csv.open_csv(
+        str(file_path),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    ) as reader:
+        pending: list[pa.RecordBatch] = []
+        pending_rows = 0
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows < chunksize:
+                continue
+            table = pa.Table.from_batches(pending)
+            while table.num_rows >= chunksize:
+                yield table.slice(0, chunksize).to_pandas(date_as_object=False)
+                table = table.slice(chunksize)
+            pending = table.to_batches()
+            pending_rows = table.num_rows
+        if pending_rows:
+            yield pa.Table.from_batches(pending, schema=reader.schema).to_pandas(date_as_object=False)
+
+
+def save_chunks(frames: Iterable[pd.DataFrame], csv_dest: Path, parquet_dest: Path) -> int:
+    """Stream DataFrames into one CSV and one Parquet file without concatenating.
+
+    The first frame fixes the output schema. Integer and float columns are
+    widened to 64 bits, since a downcast that fits one chunk need not fit
+    the next; later frames are reindexed to the first frame's columns and
+    coerced to its types (extra columns are dropped, missing ones are null).
+    The CSV is appended chunk by chunk with ``DataFrame.to_csv``, like
+    :func:`save_csv`; datetime columns must keep the text format of the
+    first chunk (see :func:`_datetime_text_kind`).
+
+    Args:
+        frames: Cleaned DataFrames, consumed one at a time.
+        csv_dest: Destination ``.csv`` path.
+        parquet_dest: Destination ``.parquet`` path (atomic replace).
+
+    Returns:
+        Total number of rows written.
+
+    Raises:
+        ValueError: If no frames are produced or a later frame cannot be
+            cast to the first frame's schema or written in its text format.
+    """
+    tmp = tmp_path_for(parquet_dest)
+    parquet_writer = None
+    text_kinds: dict[str, str] = {}
+    rows = 0
+    try:
+        with open(csv_dest, "w", encoding="utf-8", newline="") as csv_fh:
+            for df in frames:
+                if parquet_writer is None:
+                    schema = _chunk_schema(df)
+                    parquet_writer = pq.ParquetWriter(str(tmp), schema, compression="zstd")
+                else:
+                    dropped = df.columns.difference(schema.names)
+                    if not dropped.empty:
+                        logger.warning("Dropping columns absent from the first chunk: %s", list(dropped))
+                table = _chunk_table(df, schema)
+                # Nullable ints stay ints (object) so no chunk prints "3.0"
+                frame = table.to_pandas(integer_object_nulls=True)
+                for col in frame.select_dtypes(include=["datetime", "datetimetz"]).columns:
+                    kind = _datetime_text_kind(frame[col])
+                    first = text_kinds.setdefault(col, kind) if kind else None
+                    if first is not None and kind != first:
+                        raise ValueError(
+                            f"Column '{col}' would be written as {kind} values after {first} ones"
+                        )
+                parquet_writer.write_table(table)
+                frame.to_csv(csv_fh, header=csv_fh.tell() == 0, index=False)
+                rows += table.num_rows
+        if parquet_writer is None:
+            raise ValueError("CSV file produced no rows")
+    except Exception:
+        if parquet_writer is not None:
+            parquet_writer.close()
+        tmp.unlink(missing_ok=True)
+        csv_dest.unlink(missing_ok=True)
+        raise
+    parquet_writer.close()
+    os.replace(tmp, parquet_dest)
+    logger.info("Streamed %d rows to %s and %s", rows, csv_dest.name, parquet_dest.name)
+    return rows
+
+
+def _datetime_text_kind(series: pd.Series) -> str | None:
+    """Return how ``DataFrame.to_csv`` renders a datetime column.
+
+    ``to_csv`` prints tz-naive midnight-only columns as dates and otherwise
+    uses the finest sub-second resolution present, so chunks written
+    separately only line up when they share the result.
+
+    Args:
+        series: Datetime column of one chunk.
+
+    Returns:
+        ``"date"``, ``"s"``, ``"ms"``, ``"us"`` or ``"ns"``; ``None`` if
+        every value is missing.
+    """
+    values = series.dropna()
+    if values.empty:
+        return None
+    if values.dt.tz is None and (values == values.dt.normalize()).all():
+        return "date"
+    sub_second = values.dt.as_unit("ns").astype("int64") % 1_000_000_000
+    for kind, step in (("s", 1_000_000_000), ("ms", 1_000_000), ("us", 1_000)):
+        if (sub_second % step == 0).all():
+            return kind
+    return "ns"
+
+
+def _chunk_schema(df: pd.DataFrame) -> pa.Schema:
+    """Arrow schema for chunked output: 64-bit numerics, strings for all-null columns.
+
+    Args:
+        df: First cleaned chunk.
+
+    Returns:
+        Schema without pandas metadata (per-chunk dtypes no longer apply).
+    """
+    fields = []
+    for field in pa.Schema.from_pandas(df, preserve_index=False):
+        if pa.types.is_integer(field.type):
+            field = field.with_type(pa.int64())
+        elif pa.types.is_floating(field.type):
+            field = field.with_type(pa.float64())
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _chunk_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Build an Arrow table for ``df`` that matches ``schema`` exactly.
+
+    Args:
+        df: Cleaned chunk.
+        schema: Schema fixed by the first chunk.
+
+    Returns:
+        Arrow table with ``schema``.
+
+    Raises:
+        ValueError: If a column cannot be represented in its schema type.
+    """
+    arrays = []
+    for field in schema:
+        if field.name in df.columns:
+            series = df[field.name]
+        else:
+            series = pd.Series(None, index=df.index, dtype=object)
+        kind = series.dtype.kind
+        try:
+            if pa.types.is_timestamp(field.type) and kind != "M":
+                series = pd.to_datetime(series, errors="coerce", format="mixed")
+            elif (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)) and kind not in "biuf":
+                series = pd.to_numeric(series)  # text in a numeric column is drift, not NaN
+            elif series.dtype == np.float32:
+                # Only NaN-holding date parts are float32 here (chunk pipelines
+                # skip float downcasting), so widening is exact
+                series = series.astype(np.float64)
+            elif pa.types.is_string(field.type) and kind != "O":
+                series = series.where(series.isna(), series.astype(str))
+            arrays.append(pa.array(series, type=field.type, from_pandas=True))
+        except (ValueError, TypeError, pa.ArrowTypeError) as exc:
+            raise ValueError(f"Column '{field.name}' does not fit the first chunk's type {field.type}: {exc}") from exc
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def load_processed(file_path: Path) -> pd.DataFrame:
+    """Load a processed file, preferring its Parquet sibling over the CSV.
+
+    Parquet keeps the dtypes produced by the ETL pipeline (datetimes,
+    downcast numerics) and skips text parsing entirely.
+
+    Args:
+        file_path: Path to the processed CSV.
+
+    Returns:
+        Pandas DataFrame.
+    """
+    parquet_path = parquet_path_for(file_path)
+    if pq is not None and parquet_path.exists():
+        try:
+            df = pq.read_table(str(parquet_path)).to_pandas()
+            logger.info("Loaded Parquet with %d rows × %d columns", len(df), len(df.columns))
+            return df
+        except (pa.ArrowException, OSError) as exc:
+            logger.warning("Parquet read failed for %s, using CSV: %s", parquet_path.name, exc)
+    return load_csv(file_path)
@@ -1,5 +1,6 @@
 """
-Structured logging with rotating file handler and console output.
+Structured logging with rotating file handler and console output,
+configured once on the root logger when this module is first imported.
 
 Usage:
     from utils.logger import get_logger
@@ -14,21 +15,18 @@ from logging.handlers import RotatingFileHandler
 import config
 
 
-def get_logger(name: str) -> logging.Logger:
-    """Create or retrieve a logger with console + rotating-file handlers.
-
-    Args:
-        name: Logger name, typically ``__name__``.
+def _configure_root() -> None:
+    """Attach the console and rotating-file handlers to the root logger once.
 
-    Returns:
-        Configured ``logging.Logger`` instance.
+    Module loggers propagate to the root, so the log file is opened a single
+    time per process. Skipped if the root logger already has handlers (e.g.
+    set up by a host process or test runner).
     """
-    logger = logging.getLogger(name)
-
-    if logger.handlers:
-        return logger
+    root = logging.getLogger()
+    if root.handlers:
+        return
 
-    logger.setLevel(getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
+    root.setLevel(getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
 
     formatter = logging.Formatter(
         fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
@@ -38,7 +36,7 @@ def get_logger(name: str) -> logging.Logger:
     # Console handler
     console = logging.StreamHandler(sys.stdout)
     console.setFormatter(formatter)
-    logger.addHandler(console)
+    root.addHandler(console)
 
     # Rotating file handler
     log_file = config.LOG_FOLDER / "app.log"
@@ -48,6 +46,19 @@ def get_logger(name: str) -> logging.Logger:
         backupCount=config.LOG_BACKUP_COUNT,
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    root.addHandler(file_handler)
+
+
+_configure_root()
 
-    return logger
+
+def get_logger(name: str) -> logging.Logger:
+    """Retrieve a logger; records propagate to the root handlers.
+
+    Args:
+        name: Logger name, typically ``__name__``.
+
+    Returns:
+        ``logging.Logger`` instance.
+    """
+    return logging.getLogger(name)
@@ -14,16 +14,18 @@ from utils.logger import get_logger
 logger = get_logger(__name__)
 
 
-def validate_file_size(file_path: Path) -> None:
+def validate_file_size(file_path: Path, size: int | None = None) -> None:
     """Raise ``ValueError`` if file exceeds the configured size limit.
 
     Args:
         file_path: Path to the file on disk.
+        size: File size in bytes if the caller already has it from ``stat()``.
 
     Raises:
         ValueError: If file exceeds ``MAX_CONTENT_LENGTH``.
     """
-    size = file_path.stat().st_size
+    if size is None:
+        size = file_path.stat().st_size
     if size > config.MAX_CONTENT_LENGTH:
         max_mb = config.MAX_CONTENT_LENGTH / (1024 * 1024)
         actual_mb = size / (1024 * 1024)
@@ -33,11 +35,32 @@ def validate_file_size(file_path: Path) -> None:
         )
 
 
-def validate_csv(df: pd.DataFrame) -> list[str]:
+def quality_counts(df: pd.DataFrame) -> tuple[pd.Series, int]:
+    """Count missing values per column and duplicate rows.
+
+    Compute these once and pass them to :func:`validate_csv` and
+    :func:`get_upload_metadata`, which would otherwise each rescan the frame.
+
+    Args:
+        df: Loaded DataFrame.
+
+    Returns:
+        Tuple of (missing-value count per column, duplicate row count).
+    """
+    return df.isna().sum(), int(df.duplicated().sum())
+
+
+def validate_csv(
+    df: pd.DataFrame,
+    na_counts: pd.Series | None = None,
+    dup_count: int | None = None,
+) -> list[str]:
     """Run data-quality checks on a loaded DataFrame.
 
     Args:
         df: DataFrame to validate.
+        na_counts: Precomputed missing-value counts from :func:`quality_counts`.
+        dup_count: Precomputed duplicate row count from :func:`quality_counts`.
 
     Returns:
         List of warning/info messages (empty if clean).
@@ -54,7 +77,9 @@ def validate_csv(df: pd.DataFrame) -> list[str]:
         raise ValueError("CSV file has no columns.")
 
     # Check for entirely null columns
-    null_cols = [c for c in df.columns if df[c].isna().all()]
+    if na_counts is None:
+        na_counts = df.isna().sum()
+    null_cols = na_counts.index[na_counts == len(df)].tolist()
     if null_cols:
         warnings.append(f"Entirely null columns detected: {null_cols}")
 
@@ -66,7 +91,8 @@ def validate_csv(df: pd.DataFrame) -> list[str]:
         )
 
     # Check for excessive duplicates
-    dup_count = int(df.duplicated().sum())
+    if dup_count is None:
+        dup_count = int(df.duplicated().sum())
     if dup_count > 0:
         pct = dup_count / len(df) * 100
         warnings.append(f"{dup_count} duplicate rows ({pct:.1f}%) found.")
@@ -77,23 +103,38 @@ def validate_csv(df: pd.DataFrame) -> list[str]:
     return warnings
 
 
-def get_upload_metadata(df: pd.DataFrame, file_path: Path) -> dict:
+def get_upload_metadata(
+    df: pd.DataFrame,
+    file_path: Path,
+    na_counts: pd.Series | None = None,
+    dup_count: int | None = None,
+    size: int | None = None,
+) -> dict:
     """Build metadata dict for an uploaded file.
 
     Args:
         df: Loaded DataFrame.
         file_path: Path to the file on disk.
+        na_counts: Precomputed missing-value counts from :func:`quality_counts`.
+        dup_count: Precomputed duplicate row count from :func:`quality_counts`.
+        size: File size in bytes if the caller already has it from ``stat()``.
 
     Returns:
         Metadata dictionary.
     """
+    if na_counts is None:
+        na_counts = df.isna().sum()
+    if dup_count is None:
+        dup_count = int(df.duplicated().sum())
+    if size is None:
+        size = file_path.stat().st_size
     return {
         "filename": file_path.name,
         "row_count": len(df),
         "column_count": len(df.columns),
         "columns": list(df.columns),
         "data_types": {col: str(dtype) for col, dtype in df.dtypes.items()},
-        "missing_values": {col: int(df[col].isna().sum()) for col in df.columns},
-        "duplicate_rows": int(df.duplicated().sum()),
-        "size_kb": round(file_path.stat().st_size / 1024, 1),
+        "missing_values": {col: int(n) for col, n in na_counts.items()},
+        "duplicate_rows": dup_count,
+        "size_kb": round(size / 1024, 1),
     }